@@ -29,6 +29,11 @@ from defs import *
     Graphics components for azimuth and elevation position
 """
 
+# Pointer headings are whole degrees so the trig for each position can be
+# precomputed once rather than on every paint.
+_COS = tuple(math.cos(math.radians(d)) for d in range(360))
+_SIN = tuple(math.sin(math.radians(d)) for d in range(360))
+
 """
     Azimuth position
 """
@@ -44,10 +49,19 @@ class AzPos(QWidget):
         
         super(AzPos, self).__init__()
         self.__heading = -90
-    
+        # Pens never change so build them once rather than on every paint
+        self.__borderPen = QPen(QtCore.Qt.black, 1, QtCore.Qt.SolidLine)
+        self.__circlePen = QPen(QtCore.Qt.blue, 4, QtCore.Qt.SolidLine)
+        self.__pointerPen = QPen(QtCore.Qt.red, 1, QtCore.Qt.SolidLine)
+
     def setHeading(self, heading):
-        self.__heading = heading - 90
-        self.repaint()
+        # Skip the paint cycle if the heading hasn't changed
+        new = heading - 90
+        if new == self.__heading:
+            return
+        self.__heading = new
+        # update() lets Qt coalesce a burst of changes into one paint
+        self.update()
         
     def paintEvent(self, event):
         """
@@ -70,29 +84,34 @@ class AzPos(QWidget):
             qt      -- painter
         """
         qp.setRenderHint(QPainter.Antialiasing)
-        
+
+        # Cache bound methods as this runs on every paint
+        setPen = qp.setPen
+        drawText = qp.drawText
+
         # The graphic is a circle marked North and 90, 180, 270 degrees
         # The heading is an arrow that moves around the circle.
         # Bounding rect
-        qp.setPen(QPen(QtCore.Qt.black, 1, QtCore.Qt.SolidLine))
+        setPen(self.__borderPen)
         qp.drawRect(5,5,170,170)
-        
+
         # Circle
-        qp.setPen(QPen(QtCore.Qt.blue,  4, QtCore.Qt.SolidLine))
+        setPen(self.__circlePen)
         qp.drawEllipse(35,35,110,110)
-        
+
         # Text
-        qp.setPen(QPen(QtCore.Qt.black, 1, QtCore.Qt.SolidLine))
-        qp.drawText(85,25, "N")
-        qp.drawText(155,95, "90")
-        qp.drawText(80,165, "180")
-        qp.drawText(10,95, "270")
-        
+        setPen(self.__borderPen)
+        drawText(85,25, "N")
+        drawText(155,95, "90")
+        drawText(80,165, "180")
+        drawText(10,95, "270")
+
         # Pointer
-        qp.setPen(QPen(QtCore.Qt.red, 1, QtCore.Qt.SolidLine))
-        
-        x = 90 + 55 * math.cos(math.radians(self.__heading))
-        y = 90 + 55 * math.sin(math.radians(self.__heading))
+        setPen(self.__pointerPen)
+
+        h = int(self.__heading) % 360
+        x = 90 + 55 * _COS[h]
+        y = 90 + 55 * _SIN[h]
         qp.drawLine(90,90,x,y)
         
 """
@@ -110,10 +129,24 @@ class ElPos(QWidget):
         
         super(ElPos, self).__init__()
         self.__elevation = 0
-    
+        # Pens never change so build them once rather than on every paint
+        self.__borderPen = QPen(QtCore.Qt.black, 1, QtCore.Qt.SolidLine)
+        self.__basePen = QPen(QtCore.Qt.black, 4, QtCore.Qt.SolidLine)
+        self.__arcPen = QPen(QtCore.Qt.blue, 1, QtCore.Qt.DashLine)
+        self.__pointerPen = QPen(QtCore.Qt.red, 1, QtCore.Qt.SolidLine)
+        # The arc geometry is constant so build the path once
+        self.__arcPath = QPainterPath()
+        self.__arcPath.moveTo(150, 150)
+        self.__arcPath.cubicTo(150, 150, 150, 40, 20, 25)
+
     def setElevation(self, elevation):
-        self.__elevation = -elevation
-        self.repaint()
+        # Skip the paint cycle if the elevation hasn't changed
+        new = -elevation
+        if new == self.__elevation:
+            return
+        self.__elevation = new
+        # update() lets Qt coalesce a burst of changes into one paint
+        self.update()
         
     def paintEvent(self, event):
         """
@@ -137,34 +170,36 @@ class ElPos(QWidget):
         """
         
         qp.setRenderHint(QPainter.Antialiasing)
-        
+
+        # Cache bound methods as this runs on every paint
+        setPen = qp.setPen
+        drawText = qp.drawText
+
         # The graphic is a arc marked 0, 45, 90 degrees
         # The elevation is an arrow that moves on the arc.
         # Bounding rect
-        qp.setPen(QPen(QtCore.Qt.black, 1, QtCore.Qt.SolidLine))
+        setPen(self.__borderPen)
         qp.drawRect(5,5,170,170)
-        
+
         # Base line
-        qp.setPen(QPen(QtCore.Qt.black, 4, QtCore.Qt.SolidLine))
+        setPen(self.__basePen)
         qp.drawLine(20,150,150,150)
-        
+
         # Draw arc
-        qp.setPen(QPen(QtCore.Qt.blue, 1, QtCore.Qt.DashLine))
-        path = QPainterPath()
-        path.moveTo(150, 150)
-        path.cubicTo(150, 150, 150, 40, 20, 25)
-        qp.drawPath(path)
-        
+        setPen(self.__arcPen)
+        qp.drawPath(self.__arcPath)
+
         # Text
-        qp.setPen(QPen(QtCore.Qt.black, 1, QtCore.Qt.SolidLine))
-        qp.drawText(165, 150, "0")
-        qp.drawText(110,60, "45")
-        qp.drawText(20,20, "90")
-        
+        setPen(self.__borderPen)
+        drawText(165, 150, "0")
+        drawText(110,60, "45")
+        drawText(20,20, "90")
+
         # Pointer
-        qp.setPen(QPen(QtCore.Qt.red, 1, QtCore.Qt.SolidLine))
-        x = 20 + 130 * math.cos(math.radians(self.__elevation))
-        y = 150 + 130 * math.sin(math.radians(self.__elevation))
+        setPen(self.__pointerPen)
+        e = int(self.__elevation) % 360
+        x = 20 + 130 * _COS[e]
+        y = 150 + 130 * _SIN[e]
         qp.drawLine(20,150,x,y)
         
         
\ No newline at end of file
@@ -1,42 +1,45 @@
-#!/usr/bin/env python3
-#
-# import.py
-# 
-# Copyright (C) 2020 by G3UKB Bob Cowdery
-# This program is free software; you can redistribute it and/or modify
-# it under the terms of the GNU General Public License as published by
-# the Free Software Foundation; either version 2 of the License, or
-# (at your option) any later version.
-#    
-#  This program is distributed in the hope that it will be useful,
-#  but WITHOUT ANY WARRANTY; without even the implied warranty of
-#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
-#  GNU General Public License for more details.
-#    
-#  You should have received a copy of the GNU General Public License
-#  along with this program; if not, write to the Free Software
-#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
-#    
-#  The author can be reached by email at:   
-#     bob@bobcowdery.plus.com
-#
-
-# System imports
-import os, sys
-import platform
-import traceback
-import configparser
-import pickle
-import socket
-import serial
-import glob
-import threading
-import math
-from time import sleep
-from collections import deque
-
-# PyQt5 imports
-from PyQt5.QtWidgets import QMainWindow, QApplication
-from PyQt5.QtGui import QPainter, QPainterPath, QColor, QPen, QFont
-from PyQt5 import QtCore, QtGui
-from PyQt5.QtWidgets import QFrame, QGroupBox, QMessageBox, QLabel, QLineEdit, QTextEdit, QComboBox, QPushButton, QCheckBox, QRadioButton, QSpinBox, QAction, QWidget, QGridLayout
+#!/usr/bin/env python3
+#
+# import.py
+# 
+# Copyright (C) 2020 by G3UKB Bob Cowdery
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#    
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#    
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#    
+#  The author can be reached by email at:   
+#     bob@bobcowdery.plus.com
+#
+
+# System imports
+import os, sys
+import platform
+import traceback
+import configparser
+import pickle
+import socket
+import selectors
+import errno
+import serial
+import glob
+import threading
+import queue
+import math
+from time import sleep
+from collections import deque
+
+# PyQt5 imports
+from PyQt5.QtWidgets import QMainWindow, QApplication
+from PyQt5.QtGui import QPainter, QPainterPath, QColor, QPen, QFont
+from PyQt5 import QtCore, QtGui
+from PyQt5.QtWidgets import QFrame, QGroupBox, QMessageBox, QLabel, QLineEdit, QTextEdit, QPlainTextEdit, QComboBox, QPushButton, QCheckBox, QRadioButton, QSpinBox, QAction, QWidget, QGridLayout
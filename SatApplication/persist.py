@@ -53,16 +53,18 @@ def getSavedCfg(path):
 				pass
 	return cfg
 		
-def saveCfg(path, cfg):
+def saveCfg(path, cfg, msgq=None):
 	"""
 	Save the configuration
-	
+
 	Arguments:
 		path    -- path to state file
 		cfg   	-- configuration to save
-		
+		msgq    -- report errors here when calling off the GUI thread,
+		           widgets must not be used from a worker thread
+
 	"""
-	
+
 	try:
 		dir, file = os.path.split(path)
 		if not os.path.exists(dir):
@@ -71,7 +73,10 @@ def saveCfg(path, cfg):
 		pickle.dump(cfg, f)
 	except Exception as e:
 		# Error saving configuration file
-		QMessageBox.information(None, 'Configuration File - Exception','Exception [%s]' % (str(e)), QMessageBox.Ok)
+		if msgq != None:
+			msgq.put('Error saving configuration file! [%s]' % (str(e)))
+		else:
+			QMessageBox.information(None, 'Configuration File - Exception','Exception [%s]' % (str(e)), QMessageBox.Ok)
 	finally:
 		try:
 			f.close()
@@ -1,601 +1,699 @@
-#!/usr/bin/env python3
-#
-# rotif.py
-# 
-# Copyright (C) 2020 by G3UKB Bob Cowdery
-# This program is free software; you can redistribute it and/or modify
-# it under the terms of the GNU General Public License as published by
-# the Free Software Foundation; either version 2 of the License, or
-# (at your option) any later version.
-#    
-#  This program is distributed in the hope that it will be useful,
-#  but WITHOUT ANY WARRANTY; without even the implied warranty of
-#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
-#  GNU General Public License for more details.
-#    
-#  You should have received a copy of the GNU General Public License
-#  along with this program; if not, write to the Free Software
-#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
-#    
-#  The author can be reached by email at:   
-#     bob@bobcowdery.plus.com
-#
-
-# Application imports
-from imports import *
-from defs import *
-import defs
-import persist
-
-"""
-    Interface to the controller for the azimuth/elevation system.
-"""
-
-"""
-    Main class of the azimuth/elevation rotator interface
-"""
-class RotIf(threading.Thread):
-    
-    def __init__(self, state_callback, pos_callback, cmdq, msgq):
-        """
-        Constructor
-        
-        Arguments:
-            state_callback  -- startup states
-            pos_callback    -- callback for position events
-            cmdq            --  add commands for execution here
-            msgq            --  add messages for output here
-        """
-        
-        super(RotIf, self).__init__()
-        self.__state_callback = state_callback
-        self.__pos_callback = pos_callback
-        self.__cmdq = cmdq
-        self.__msgq = msgq
-        
-        # Create a socket for the command channel
-        # This is command/response channel
-        self.__cmdsock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.__cmdsock.settimeout(defs.HW_TIMEOUT)
-        
-        # Create and start the event thread
-        self.__evntIf = EvntIf(self.__event_callback, self.__msgq)
-        self.__evntIf.start()
-            
-        # Class vars
-        self.__terminate = False
-        self.__lock = threading.Lock()
-        # Last calibration
-        self.__calaz = -1
-        self.__calel = -1
-        # Last position
-        self.__degaz = -1
-        self.__degel = -1
-        # Dispatch table
-        self.__lookup = {
-            "coldstart": self.coldStart,
-            "poll": self.poll,
-            "isonline": self.isOnLine,
-            "getPos": self.getPos,
-            "setCalAz": self.setCalAz,
-            "setCalEl": self.setCalEl,
-            "setAzSpeed": self.setAzSpeed,
-            "setElSpeed": self.setElSpeed,
-            "calibrateAz": self.calibrateAz,
-            "calibrateEl": self.calibrateEl,
-            "homeAz": self.homeAz,
-            "homeEl": self.homeEl,
-            "setPosAz": self.setPosAz,
-            "setPosEl": self.setPosEl,
-            "nudgeazfwd": self.nudgeAzFwd,
-            "nudgeazrev": self.nudgeAzRev,
-            "nudgeelfwd": self.nudgeElFwd,
-            "nudgeelrev": self.nudgeElRev,
-        }
-        # Current status
-        self.__status = OFFLINE
-        
-        self.__msgq.append('HW interface initialised')
-    
-    def terminate(self):
-        """
-        Terminate interface
-        
-        Arguments:
-            
-        """
-        # Terminate self
-        self.__terminate = True
-        # Terminate threads
-        self.__evntIf.terminate()
-        self.__evntIf.join()
-        
-        # Save calibration
-        if self.__calaz != -1 and self.__calel != -1:   
-            defs.config["Calibration"]["AZ"] = self.__calaz
-            defs.config["Calibration"]["EL"] = self.__calel
-
-    # Thread entry point
-    def run(self):
-        """
-        Run until terminated
-        
-        Arguments:
-            
-        """
-        # Loop until terminated by the user
-        self.__msgq.append( 'Rotator Interface running')
-        while not self.__terminate:
-            # Process commsnd queue
-            while len(self.__cmdq) > 0:
-                cmd, args = self.__cmdq.popleft()
-                if len(args) > 0:
-                    if not self.__lookup[cmd](args):
-                        self.__msgq.append( 'Error executing command %s with args %s!' % (cmd, str(args)))
-                else:
-                    if not self.__lookup[cmd]():
-                        self.__msgq.append( 'Error executing command %s!' % (cmd))
-            sleep(0.1)
-        self.__msgq.append( 'Rotator Interface terminating...')
-        
-    # Cold start
-    def coldStart(self):
-        """
-        Cold start system
-        
-        Arguments:
-            
-        """
-        if self.__status == OFFLINE: return False
-        # Set speed
-        if not self.setAzSpeed(defs.AZ_MOTOR_SPEED):
-            self.__msgq.append('Failed to set azimuth motor speed!')
-            self.__state_callback(CAL_FAILED)
-            self.__status = CAL_FAILED
-            return False
-        if not self.setElSpeed(defs.EL_MOTOR_SPEED):
-            self.__msgq.append('Failed to set elevation motor speed!')
-            self.__state_callback(CAL_FAILED)
-            self.__status = CAL_FAILED
-            return False
-        if ("AZ" not in defs.config["Calibration"]) or ("EL" not in defs.config["Calibration"]):
-            # Perform a calibration
-            # Calibrate AZ motor
-            if not self.calibrateAz():
-                self.__msgq.append('Failed to calibrate azimuth motor!')
-                self.__state_callback(CAL_FAILED)
-                self.__status = CAL_FAILED
-                return False
-            # Calibrate EL motor
-            if not self.calibrateEl():
-                self.__msgq.append('Failed to calibrate elevation motor!')
-                self.__state_callback(CAL_FAILED)
-                self.__status = CAL_FAILED
-                return False
-        else:
-            # Set saved calibration
-            if not self.setCalAz(defs.config["Calibration"]["AZ"]):
-                self.__state_callback(CAL_FAILED)
-                self.__status = CAL_FAILED
-                return False
-            if not self.setCalEl(defs.config["Calibration"]["EL"]):
-                self.__state_callback(CAL_FAILED)
-                self.__status = CAL_FAILED
-                return False
-            
-        self.__state_callback(ONLINE)
-        self.__status = ONLINE
-        return True
-            
-    def poll(self):
-        """
-        HW online?
-        
-        Arguments:
-            
-        """
-        self.__lock.acquire()
-        self.__cmdsock.settimeout(defs.HW_TIMEOUT)
-        r, d = self.__doCommand("poll")
-        self.__lock.release()
-        if not r or d == 'nak':
-            return False
-        else:
-            # Success
-            self.__state_callback(PENDING)
-            self.__status = PENDING
-        return True
-    
-    def isOnLine(self):
-        """
-        HW still online?
-        
-        Arguments:
-            
-        """
-        self.__lock.acquire()
-        self.__cmdsock.settimeout(defs.HW_TIMEOUT)
-        r, d = self.__doCommand("poll")
-        self.__lock.release()
-        if not r or d == 'nak':
-            self.__state_callback(OFFLINE)
-            self.__status = OFFLINE
-            return False
-        return True
-
-    def getPos(self, args):
-        """
-        Get azimuth and elevation position
-        Send to given q
-        Arguments:
-            args    --  [0] azimuth from sat prog
-                        [1] elevation from sat prog
-                        [2] q to send to
-        """
-        
-        az = args[0]
-        el = args[1]
-        q = args[2]
-        
-        if self.__status == ONLINE:
-            q.append('%f\n%f\n' % (float(self.__degaz), float(self.__degel)))
-        else:
-            # Reflect the position we should be at
-            q.append('%f\n%f\n' % (float(az), float(el)))
-        return True
-    
-    def isPos(self):
-        """
-        Return True if the position is known
-        """
-        
-        if self.__degaz == -1 or self.__degel == -1:
-            return False
-        return True
-        
-    def setCalAz(self, calibration):
-        """
-        Set motor calibration for azimuth motor to stored value
-        Aleviates the need to calibrate each time
-        
-        Arguments:
-            calibration   -- number of pulses between limits    
-        """
-        if self.__status == OFFLINE: return False
-        self.__lock.acquire()
-        self.__cmdsock.settimeout(defs.HW_TIMEOUT)
-        r, d = self.__doCommand("%sa" % calibration)
-        self.__lock.release()
-        if not r or d == 'nak':
-            return False
-        return True
-    
-    def setCalEl(self, calibration):
-        """
-        Set motor calibration for elevation motor to stored value
-        Aleviates the need to calibrate each time
-        
-        Arguments:
-            calibration   -- number of pulses between limits    
-        """
-        if self.__status == OFFLINE: return False
-        self.__lock.acquire()
-        self.__cmdsock.settimeout(defs.HW_TIMEOUT)
-        r, d = self.__doCommand("%sb" % calibration)
-        self.__lock.release()
-        if not r or d == 'nak':
-            return False
-        return True
-    
-    def setAzSpeed(self, speed):
-        """
-        Set azimuth motor speed
-        
-        Arguments:
-            speed   -- as % of full speed    
-        """
-        if self.__status == OFFLINE: return False
-        self.__lock.acquire()
-        self.__cmdsock.settimeout(defs.HW_TIMEOUT)
-        r, d = self.__doCommand("%sn" % speed)
-        self.__lock.release()
-        if not r or d == 'nak':
-            return False
-        return True
-    
-    def setElSpeed(self, speed):
-        """
-        Set elevation motor speed
-        
-        Arguments:
-            speed   -- as % of full speed    
-        """
-        if self.__status == OFFLINE: return False
-        self.__lock.acquire()
-        self.__cmdsock.settimeout(defs.HW_TIMEOUT)
-        r, d = self.__doCommand("%sm" % speed)
-        self.__lock.release()
-        if not r or d == 'nak':
-            return False
-        return True
-    
-    def calibrateAz(self):
-        """
-        Calibrate aximuth motor
-        
-        Arguments:
-                
-        """
-        
-        self.__lock.acquire()
-        self.__cmdsock.settimeout(defs.CAL_TIMEOUT)
-        r, d = self.__doCommand("calaz")
-        self.__lock.release()
-        if not r or d == 'nak':
-            return False
-        else:
-            self.__degaz = 0
-            self.__calaz = d
-            return True
-    
-    def calibrateEl(self):
-        """
-        Calibrate elevation motor
-        
-        Arguments:
-                
-        """
-    
-        self.__lock.acquire()
-        self.__cmdsock.settimeout(defs.CAL_TIMEOUT)
-        r, d = self.__doCommand("calel")
-        self.__lock.release()
-        if not r or d == 'nak':
-            return False
-        else:
-            self.__degel = 0
-            self.__calel = d
-            return True
-    
-    def homeAz(self):
-        """
-        Position azimuth to home.
-        Does not just move to 0 degrees but uses
-        the limit switch for true home as small errors
-        can accumulate after a track operation.
-        
-        Arguments:
-                
-        """
-        if self.__status == OFFLINE: return False
-        self.__lock.acquire()
-        self.__cmdsock.settimeout(defs.MOV_TIMEOUT)
-        r, d = self.__doCommand("homeaz")
-        self.__lock.release()   
-        if not r or d == 'nak':
-            return False
-        else:
-            self.__degaz = 0
-            self.__pos_callback('az', 0)
-        return True
-
-    def homeEl(self):
-        """
-        Position elevation to home.
-        Does not just move to 0 degrees but uses
-        the limit switch for true home as small errors
-        can accumulate after a track operation.
-        
-        Arguments:
-                
-        """
-        if self.__status == OFFLINE: return False
-        self.__lock.acquire()
-        self.__cmdsock.settimeout(defs.MOV_TIMEOUT)
-        r, d = self.__doCommand("homeel")
-        self.__lock.release()
-        if not r or d == 'nak':
-            return False
-        else:
-            self.__degel = 0
-            self.__pos_callback('el', 0)
-        return True
-    
-    def setPosAz(self, params):
-        """
-        Set rotator position
-        
-        Arguments:
-            azimuth     --  [0] position in degrees 0-360
-        """
-        #print("Set pos az ", params)
-        if self.__degaz == -1:
-            # Don't know where we are so move to home first
-            if not self.homeAz():
-                return False
-            self.__degaz = 0
-           
-        if self.__status == OFFLINE: return True, 'ack'
-        self.__lock.acquire()
-        azimuth = params[0]
-        self.__cmdsock.settimeout(defs.MOV_TIMEOUT)
-        r, d = self.__doCommand("%sz" % azimuth)
-        self.__lock.release()
-        if not r or d == 'nak':
-            return False
-        return True
-    
-    def setPosEl(self, params):
-        """
-        Set elevation position
-        
-        Arguments:
-            params   --  [0] position in degrees 0-90
-        """
-        #print("Set pos el ", params)
-        if self.__degel == -1:
-            # Don't know where we are so move to home first
-            if not self.homeEl():
-                return False
-            self.__degel = 0
-            
-        if self.__status == OFFLINE: return False
-        self.__lock.acquire()
-        elevation = params[0]
-        self.__cmdsock.settimeout(defs.MOV_TIMEOUT)
-        r, d = self.__doCommand("%se" % elevation)
-        self.__lock.release()
-        if not r or d == 'nak':
-            return False
-        return True
-
-    def nudgeAzFwd(self):
-        """
-        Nudge AZ forward a tad
-        
-        Arguments:
-            
-        """
-        if self.__status == OFFLINE: return False
-        self.__lock.acquire()
-        self.__cmdsock.settimeout(defs.MOV_TIMEOUT)
-        r, d = self.__doCommand("ngazfwd" )
-        self.__lock.release()
-        if not r or d == 'nak':
-            return False
-        return True
-    
-    def nudgeAzRev(self):
-        """
-        Nudge AZ reverse a tad
-        
-        Arguments:
-            
-        """
-        if self.__status == OFFLINE: return False
-        self.__lock.acquire()
-        self.__cmdsock.settimeout(defs.MOV_TIMEOUT)
-        r, d = self.__doCommand("ngazrev" )
-        self.__lock.release()
-        if not r or d == 'nak':
-            return False
-        return True
-    
-    def nudgeElFwd(self):
-        """
-        Nudge EL forward a tad
-        
-        Arguments:
-            
-        """
-        if self.__status == OFFLINE: return False
-        self.__lock.acquire()
-        self.__cmdsock.settimeout(defs.MOV_TIMEOUT)
-        r, d = self.__doCommand("ngelfwd" )
-        self.__lock.release()
-        if not r or d == 'nak':
-            return False
-        return True
-    
-    def nudgeElRev(self):
-        """
-        Nudge EL reverse a tad
-        
-        Arguments:
-            
-        """
-        if self.__status == OFFLINE: return False
-        self.__lock.acquire()
-        self.__cmdsock.settimeout(defs.MOV_TIMEOUT)
-        r, d = self.__doCommand("ngelrev" )
-        self.__lock.release()
-        if not r or d == 'nak':
-            return False
-        return True
-    
-    def __doCommand(self, cmd):
-        """
-        Send a command to the controller and return the response
-        
-        Arguments:
-            cmd    --  formatted command
-        """
-        
-        try:
-            # Send command
-            self.__cmdsock.sendto(bytes(cmd, 'utf-8'), (defs.HW_RQST_IP, defs.HW_RQST_PORT))
-            # Wait for a reply
-            data, address = self.__cmdsock.recvfrom(defs.HW_BUFFER)
-            return True, data.decode('utf-8')
-        except socket.timeout:
-            # No target or something failed
-            return False, 'nak'
-
-    def __event_callback(self, position):
-        
-        poslist = position.split(":", 2)
-        try:
-            self.__pos_callback(poslist[0], int(poslist[1]))
-            if poslist[0] == 'az':
-                self.__degaz = int(poslist[1])
-            elif poslist[0] == 'el':
-                self.__degel = int(poslist[1])
-        except ValueError:
-            self.__msgq.append('Bad position data! ', position)
-            
-"""
-    Thread to handle position events from the rotator
-"""
-class EvntIf(threading.Thread):
-    def __init__(self, callback, q):
-        """
-        Constructoe
-        
-        Arguments:
-            callback    --  callback here with event data
-        """
-        super(EvntIf, self).__init__()
-        
-        # Params
-        self.__callback = callback
-        self.__q = q
-        
-        # Init vars
-        self.__term = False
-        
-        # Create a socket for the event channel
-        self.__evtsock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        # Bind to any ip and the event port
-        self.__evtsock.bind((defs.HW_LOCAL_IP, defs.HW_EVNT_PORT))
-        # Set a timeout so we don't spin but are responsive to a terminate
-        self.__evtsock.settimeout(defs.HW_TIMEOUT)
-
-    def terminate(self):
-        """
-        Terminate thread
-        
-        Arguments:
-            
-        """
-        self.__term = True
-        
-    def run(self):
-        """
-        Thread entry point
-        
-        Arguments:
-            
-        """
-        
-        self.__q.append("Event thread starting (position events) ...")
-        # Spin waiting for data until told to quit
-        while not self.__term:
-            try:
-                data, addr = self.__evtsock.recvfrom(128)
-                self.__callback(data.decode('utf-8'))
-            except socket.timeout:
-                pass
-            sleep(0.1)
-            
-        self.__q.append("Event thread exiting...")
+#!/usr/bin/env python3
+#
+# rotif.py
+# 
+# Copyright (C) 2020 by G3UKB Bob Cowdery
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#    
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#    
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#    
+#  The author can be reached by email at:   
+#     bob@bobcowdery.plus.com
+#
+
+# Application imports
+from imports import *
+from defs import *
+import defs
+import persist
+
+"""
+    Interface to the controller for the azimuth/elevation system.
+"""
+
+# Parameterless command tokens pre-encoded once. All commands are plain
+# ASCII so there is no need to run the UTF-8 encoder on every send.
+_CMD_BYTES = {
+    "poll": b"poll",
+    "calaz": b"calaz",
+    "calel": b"calel",
+    "homeaz": b"homeaz",
+    "homeel": b"homeel",
+    "ngazfwd": b"ngazfwd",
+    "ngazrev": b"ngazrev",
+    "ngelfwd": b"ngelfwd",
+    "ngelrev": b"ngelrev",
+}
+
+"""
+    Main class of the azimuth/elevation rotator interface
+"""
+class RotIf(threading.Thread):
+    
+    def __init__(self, state_callback, pos_callback, cmdq, msgq):
+        """
+        Constructor
+        
+        Arguments:
+            state_callback  -- startup states
+            pos_callback    -- callback for position events
+            cmdq            --  add commands for execution here
+            msgq            --  add messages for output here
+        """
+        
+        super(RotIf, self).__init__()
+        self.__state_callback = state_callback
+        self.__pos_callback = pos_callback
+        self.__cmdq = cmdq
+        self.__msgq = msgq
+        
+        # Create a socket for the command channel
+        # This is command/response channel
+        self.__cmdsock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # Best effort - busy-poll the NIC for 50us after each request to skip
+        # the interrupt/wakeup path on the reply. Linux only and needs the
+        # net.core.busy_poll sysctl or CAP_NET_ADMIN; costs a little CPU per
+        # command in exchange for a lower round trip to the controller.
+        try:
+            self.__cmdsock.setsockopt(socket.SOL_SOCKET, getattr(socket, 'SO_BUSY_POLL', 46), 50)
+        except OSError:
+            pass
+        # Connect the socket so the kernel caches the route and filters
+        # stray datagrams from other addresses
+        self.__cmdsock.connect((defs.HW_RQST_IP, defs.HW_RQST_PORT))
+        self.__cmdsock.settimeout(defs.HW_TIMEOUT)
+        # Track the current timeout so we only pay the syscall on change
+        self.__cur_timeout = defs.HW_TIMEOUT
+        
+        # Create and start the event thread
+        self.__evntIf = EvntIf(self.__event_callback, self.__msgq)
+        self.__evntIf.start()
+            
+        # Class vars
+        self.__terminate = False
+        # Last calibration
+        self.__calaz = -1
+        self.__calel = -1
+        # Last position
+        self.__degaz = -1
+        self.__degel = -1
+        # Formatted position, rebuilt only when an event changes it
+        self.__posstr = None
+        # Dispatch table, indexed by the CMD_* opcodes in defs
+        # Indexing a tuple avoids hashing a command name per command
+        self.__lookup = (
+            self.coldStart,     # CMD_COLDSTART
+            self.poll,          # CMD_POLL
+            self.isOnLine,      # CMD_ISONLINE
+            self.getPos,        # CMD_GETPOS
+            self.setCalAz,      # CMD_SETCALAZ
+            self.setCalEl,      # CMD_SETCALEL
+            self.setAzSpeed,    # CMD_SETAZSPEED
+            self.setElSpeed,    # CMD_SETELSPEED
+            self.calibrateAz,   # CMD_CALIBRATEAZ
+            self.calibrateEl,   # CMD_CALIBRATEEL
+            self.homeAz,        # CMD_HOMEAZ
+            self.homeEl,        # CMD_HOMEEL
+            self.setPosAz,      # CMD_SETPOSAZ
+            self.setPosEl,      # CMD_SETPOSEL
+            self.nudgeAzFwd,    # CMD_NUDGEAZFWD
+            self.nudgeAzRev,    # CMD_NUDGEAZREV
+            self.nudgeElFwd,    # CMD_NUDGEELFWD
+            self.nudgeElRev,    # CMD_NUDGEELREV
+        )
+        # Current status
+        self.__status = OFFLINE
+        
+        self.__msgq.put('HW interface initialised')
+    
+    def terminate(self):
+        """
+        Terminate interface
+        
+        Arguments:
+            
+        """
+        # Terminate self
+        self.__terminate = True
+        # Terminate threads
+        self.__evntIf.terminate()
+        self.__evntIf.join()
+        
+        # Save calibration
+        if self.__calaz != -1 and self.__calel != -1:   
+            defs.config["Calibration"]["AZ"] = self.__calaz
+            defs.config["Calibration"]["EL"] = self.__calel
+
+    # Thread entry point
+    def run(self):
+        """
+        Run until terminated
+        
+        Arguments:
+            
+        """
+        # Loop until terminated by the user
+        self.__msgq.put( 'Rotator Interface running')
+        while not self.__terminate:
+            # Process command queue
+            # Block for the next command, waking periodically to check terminate
+            try:
+                cmd, args = self.__cmdq.get(timeout=0.25)
+            except queue.Empty:
+                continue
+            while True:
+                f = self.__lookup[cmd]
+                # Belt and braces - the connected command socket can
+                # surface ICMP errors as OSError so never let one kill
+                # the thread, report it and let the poll spot recovery
+                try:
+                    if len(args) > 0:
+                        if not f(args):
+                            self.__msgq.put( 'Error executing command %s with args %s!' % (f.__name__, str(args)))
+                    else:
+                        if not f():
+                            self.__msgq.put( 'Error executing command %s!' % (f.__name__))
+                except OSError as e:
+                    self.__msgq.put( 'Socket error executing command %s! [%s]' % (f.__name__, str(e)))
+                # Drain any further queued commands without blocking
+                try:
+                    cmd, args = self.__cmdq.get_nowait()
+                except queue.Empty:
+                    break
+        self.__msgq.put( 'Rotator Interface terminating...')
+        
+    # Cold start
+    def coldStart(self):
+        """
+        Cold start system
+        
+        Arguments:
+            
+        """
+        if self.__status == OFFLINE: return False
+        # Set speed
+        if not self.setAzSpeed(defs.AZ_MOTOR_SPEED):
+            self.__msgq.put('Failed to set azimuth motor speed!')
+            self.__state_callback(CAL_FAILED)
+            self.__status = CAL_FAILED
+            return False
+        if not self.setElSpeed(defs.EL_MOTOR_SPEED):
+            self.__msgq.put('Failed to set elevation motor speed!')
+            self.__state_callback(CAL_FAILED)
+            self.__status = CAL_FAILED
+            return False
+        if ("AZ" not in defs.config["Calibration"]) or ("EL" not in defs.config["Calibration"]):
+            # Perform a calibration
+            # Calibrate AZ motor
+            if not self.calibrateAz():
+                self.__msgq.put('Failed to calibrate azimuth motor!')
+                self.__state_callback(CAL_FAILED)
+                self.__status = CAL_FAILED
+                return False
+            # Calibrate EL motor
+            if not self.calibrateEl():
+                self.__msgq.put('Failed to calibrate elevation motor!')
+                self.__state_callback(CAL_FAILED)
+                self.__status = CAL_FAILED
+                return False
+        else:
+            # Set saved calibration
+            if not self.setCalAz(defs.config["Calibration"]["AZ"]):
+                self.__state_callback(CAL_FAILED)
+                self.__status = CAL_FAILED
+                return False
+            if not self.setCalEl(defs.config["Calibration"]["EL"]):
+                self.__state_callback(CAL_FAILED)
+                self.__status = CAL_FAILED
+                return False
+            
+        self.__state_callback(ONLINE)
+        self.__status = ONLINE
+        return True
+            
+    def poll(self):
+        """
+        HW online?
+        
+        Arguments:
+            
+        """
+        self.__setTimeout(defs.HW_TIMEOUT)
+        r, d = self.__doCommand("poll")
+        if not r or d == 'nak':
+            return False
+        else:
+            # Success
+            self.__state_callback(PENDING)
+            self.__status = PENDING
+        return True
+    
+    def isOnLine(self):
+        """
+        HW still online?
+
+        Arguments:
+
+        """
+        # Known OFFLINE - don't spend a socket timeout confirming it,
+        # the periodic poll will spot the controller coming back
+        if self.__status == OFFLINE: return False
+        self.__setTimeout(defs.HW_TIMEOUT)
+        r, d = self.__doCommand("poll")
+        if not r or d == 'nak':
+            self.__state_callback(OFFLINE)
+            self.__status = OFFLINE
+            return False
+        return True
+
+    def getPos(self, args):
+        """
+        Get azimuth and elevation position
+        Send to given q
+        Arguments:
+            args    --  [0] azimuth from sat prog
+                        [1] elevation from sat prog
+                        [2] q to send to
+        """
+        
+        az = args[0]
+        el = args[1]
+        q = args[2]
+        
+        if self.__status == ONLINE:
+            # Reuse the string formatted at event time as gpredict polls
+            # far more often than the position actually changes
+            if self.__posstr is None:
+                self.__posstr = '%f\n%f\n' % (float(self.__degaz), float(self.__degel))
+            q.append(self.__posstr)
+        else:
+            # Reflect the position we should be at
+            q.append('%f\n%f\n' % (float(az), float(el)))
+        return True
+    
+    def isPos(self):
+        """
+        Return True if the position is known
+        """
+        
+        if self.__degaz == -1 or self.__degel == -1:
+            return False
+        return True
+        
+    def setCalAz(self, calibration):
+        """
+        Set motor calibration for azimuth motor to stored value
+        Aleviates the need to calibrate each time
+        
+        Arguments:
+            calibration   -- number of pulses between limits    
+        """
+        if self.__status == OFFLINE: return False
+        self.__setTimeout(defs.HW_TIMEOUT)
+        r, d = self.__doCommand("%sa" % calibration)
+        if not r or d == 'nak':
+            return False
+        return True
+    
+    def setCalEl(self, calibration):
+        """
+        Set motor calibration for elevation motor to stored value
+        Aleviates the need to calibrate each time
+        
+        Arguments:
+            calibration   -- number of pulses between limits    
+        """
+        if self.__status == OFFLINE: return False
+        self.__setTimeout(defs.HW_TIMEOUT)
+        r, d = self.__doCommand("%sb" % calibration)
+        if not r or d == 'nak':
+            return False
+        return True
+    
+    def setAzSpeed(self, speed):
+        """
+        Set azimuth motor speed
+        
+        Arguments:
+            speed   -- as % of full speed    
+        """
+        if self.__status == OFFLINE: return False
+        self.__setTimeout(defs.HW_TIMEOUT)
+        r, d = self.__doCommand("%sn" % speed)
+        if not r or d == 'nak':
+            return False
+        return True
+    
+    def setElSpeed(self, speed):
+        """
+        Set elevation motor speed
+        
+        Arguments:
+            speed   -- as % of full speed    
+        """
+        if self.__status == OFFLINE: return False
+        self.__setTimeout(defs.HW_TIMEOUT)
+        r, d = self.__doCommand("%sm" % speed)
+        if not r or d == 'nak':
+            return False
+        return True
+    
+    def calibrateAz(self):
+        """
+        Calibrate aximuth motor
+
+        Arguments:
+
+        """
+
+        if self.__status == OFFLINE: return False
+        self.__setTimeout(defs.CAL_TIMEOUT)
+        r, d = self.__doCommand("calaz", retry=False)
+        if not r or d == 'nak':
+            return False
+        else:
+            # Position moved without an event so drop the cached reply
+            self.__degaz = 0
+            self.__posstr = None
+            self.__calaz = d
+            # Write the calibration through immediately. It is expensive
+            # to acquire so must survive an unclean shutdown, otherwise
+            # the next cold start repeats the whole cycle.
+            defs.config["Calibration"]["AZ"] = d
+            persist.saveCfg(CONFIG_PATH, defs.config, self.__msgq)
+            return True
+    
+    def calibrateEl(self):
+        """
+        Calibrate elevation motor
+
+        Arguments:
+
+        """
+
+        if self.__status == OFFLINE: return False
+        self.__setTimeout(defs.CAL_TIMEOUT)
+        r, d = self.__doCommand("calel", retry=False)
+        if not r or d == 'nak':
+            return False
+        else:
+            # Position moved without an event so drop the cached reply
+            self.__degel = 0
+            self.__posstr = None
+            self.__calel = d
+            # Write through as for azimuth
+            defs.config["Calibration"]["EL"] = d
+            persist.saveCfg(CONFIG_PATH, defs.config, self.__msgq)
+            return True
+    
+    def homeAz(self):
+        """
+        Position azimuth to home.
+        Does not just move to 0 degrees but uses
+        the limit switch for true home as small errors
+        can accumulate after a track operation.
+        
+        Arguments:
+                
+        """
+        if self.__status == OFFLINE: return False
+        self.__setTimeout(defs.MOV_TIMEOUT)
+        r, d = self.__doCommand("homeaz")
+        if not r or d == 'nak':
+            return False
+        else:
+            self.__degaz = 0
+            self.__posstr = None
+            self.__pos_callback('az', 0)
+        return True
+
+    def homeEl(self):
+        """
+        Position elevation to home.
+        Does not just move to 0 degrees but uses
+        the limit switch for true home as small errors
+        can accumulate after a track operation.
+        
+        Arguments:
+                
+        """
+        if self.__status == OFFLINE: return False
+        self.__setTimeout(defs.MOV_TIMEOUT)
+        r, d = self.__doCommand("homeel")
+        if not r or d == 'nak':
+            return False
+        else:
+            self.__degel = 0
+            self.__posstr = None
+            self.__pos_callback('el', 0)
+        return True
+    
+    def setPosAz(self, params):
+        """
+        Set rotator position
+        
+        Arguments:
+            azimuth     --  [0] position in degrees 0-360
+        """
+        #print("Set pos az ", params)
+        if self.__degaz == -1:
+            # Don't know where we are so move to home first
+            if not self.homeAz():
+                return False
+            self.__degaz = 0
+            self.__posstr = None
+
+        if self.__status == OFFLINE: return False
+        azimuth = params[0]
+        self.__setTimeout(defs.MOV_TIMEOUT)
+        r, d = self.__doCommand("%sz" % azimuth)
+        if not r or d == 'nak':
+            return False
+        return True
+    
+    def setPosEl(self, params):
+        """
+        Set elevation position
+        
+        Arguments:
+            params   --  [0] position in degrees 0-90
+        """
+        #print("Set pos el ", params)
+        if self.__degel == -1:
+            # Don't know where we are so move to home first
+            if not self.homeEl():
+                return False
+            self.__degel = 0
+            self.__posstr = None
+
+        if self.__status == OFFLINE: return False
+        elevation = params[0]
+        self.__setTimeout(defs.MOV_TIMEOUT)
+        r, d = self.__doCommand("%se" % elevation)
+        if not r or d == 'nak':
+            return False
+        return True
+
+    def nudgeAzFwd(self):
+        """
+        Nudge AZ forward a tad
+        
+        Arguments:
+            
+        """
+        if self.__status == OFFLINE: return False
+        self.__setTimeout(defs.MOV_TIMEOUT)
+        r, d = self.__doCommand("ngazfwd", retry=False)
+        if not r or d == 'nak':
+            return False
+        return True
+    
+    def nudgeAzRev(self):
+        """
+        Nudge AZ reverse a tad
+        
+        Arguments:
+            
+        """
+        if self.__status == OFFLINE: return False
+        self.__setTimeout(defs.MOV_TIMEOUT)
+        r, d = self.__doCommand("ngazrev", retry=False)
+        if not r or d == 'nak':
+            return False
+        return True
+    
+    def nudgeElFwd(self):
+        """
+        Nudge EL forward a tad
+        
+        Arguments:
+            
+        """
+        if self.__status == OFFLINE: return False
+        self.__setTimeout(defs.MOV_TIMEOUT)
+        r, d = self.__doCommand("ngelfwd", retry=False)
+        if not r or d == 'nak':
+            return False
+        return True
+    
+    def nudgeElRev(self):
+        """
+        Nudge EL reverse a tad
+        
+        Arguments:
+            
+        """
+        if self.__status == OFFLINE: return False
+        self.__setTimeout(defs.MOV_TIMEOUT)
+        r, d = self.__doCommand("ngelrev", retry=False)
+        if not r or d == 'nak':
+            return False
+        return True
+    
+    def __setTimeout(self, timeout):
+        """
+        Set the command socket timeout, skipping the syscall
+        when the socket is already set to the requested value
+
+        Arguments:
+            timeout    --  timeout in seconds
+        """
+
+        if timeout != self.__cur_timeout:
+            self.__cmdsock.settimeout(timeout)
+            self.__cur_timeout = timeout
+
+    def __doCommand(self, cmd, retry=True):
+        """
+        Send a command to the controller and return the response
+
+        Arguments:
+            cmd     --  formatted command
+            retry   --  False for commands that must not be re-executed,
+                        i.e. nudge and calibrate where a retransmit after
+                        a lost or late ack would move the motor again or
+                        restart a calibration sweep
+        """
+
+        # An ack can arrive after we gave up waiting for it. Discard
+        # anything still buffered from an earlier command so it is not
+        # read as the reply to this one.
+        self.__cmdsock.setblocking(False)
+        try:
+            while True:
+                self.__cmdsock.recv(defs.HW_BUFFER)
+        except OSError:
+            # Empty buffer, or an ICMP error surfaced by the connected
+            # socket - either way there is nothing stale left to read
+            pass
+        finally:
+            self.__cmdsock.settimeout(self.__cur_timeout)
+
+        # UDP can drop the odd datagram so idempotent commands are
+        # retried a few times before reporting failure.
+        # Fixed tokens are pre-encoded, only parameterised commands
+        # need encoding here.
+        data = _CMD_BYTES.get(cmd)
+        if data is None:
+            data = cmd.encode('ascii')
+        for tries in range(3 if retry else 1):
+            try:
+                # Send command
+                self.__cmdsock.send(data)
+                # Wait for a reply
+                reply = self.__cmdsock.recv(defs.HW_BUFFER)
+                return True, reply.decode('utf-8')
+            except socket.timeout:
+                # No reply, try again
+                continue
+            except OSError:
+                # The connected socket surfaces ICMP errors, e.g.
+                # connection refused while the controller is rebooting.
+                # Treat as a failed attempt like a timeout.
+                continue
+        # No target or something failed
+        return False, 'nak'
+
+    def __event_callback(self, position):
+        
+        axis, _, value = position.partition(':')
+        try:
+            deg = int(value)
+            # During a slew the controller can repeat a degree value many
+            # times. Only publish a change so the GUI isn't redrawn for
+            # positions it is already showing.
+            if axis == 'az':
+                if deg == self.__degaz:
+                    return
+                self.__degaz = deg
+                self.__posstr = None
+            elif axis == 'el':
+                if deg == self.__degel:
+                    return
+                self.__degel = deg
+                self.__posstr = None
+            self.__pos_callback(axis, deg)
+        except ValueError:
+            self.__msgq.put('Bad position data! [%s]' % position)
+            
+"""
+    Thread to handle position events from the rotator
+"""
+class EvntIf(threading.Thread):
+    def __init__(self, callback, q):
+        """
+        Constructoe
+        
+        Arguments:
+            callback    --  callback here with event data
+        """
+        super(EvntIf, self).__init__()
+        
+        # Params
+        self.__callback = callback
+        self.__q = q
+        
+        # Init vars
+        self.__term = False
+        
+        # Create a socket for the event channel
+        self.__evtsock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # Allow a quick restart on the same port
+        self.__evtsock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Enlarge the receive buffer so a burst of position events
+        # during a fast slew does not overrun it and drop packets
+        self.__evtsock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 262144)
+        # Bind to any ip and the event port
+        self.__evtsock.bind((defs.HW_LOCAL_IP, defs.HW_EVNT_PORT))
+        # Set a short timeout so we are responsive to a terminate.
+        # The blocking recvfrom does the waiting, no sleep is needed.
+        self.__evtsock.settimeout(0.25)
+
+    def terminate(self):
+        """
+        Terminate thread
+        
+        Arguments:
+            
+        """
+        self.__term = True
+        
+    def run(self):
+        """
+        Thread entry point
+        
+        Arguments:
+            
+        """
+        
+        self.__q.put("Event thread starting (position events) ...")
+        # Spin waiting for data until told to quit
+        while not self.__term:
+            try:
+                data, addr = self.__evtsock.recvfrom(128)
+                self.__callback(data.decode('utf-8'))
+            except socket.timeout:
+                pass
+
+        self.__q.put("Event thread exiting...")
         
\ No newline at end of file
@@ -1,1161 +1,1366 @@
-#!/usr/bin/env python3
-#
-# rotui.py
-# 
-# Copyright (C) 2020 by G3UKB Bob Cowdery
-# This program is free software; you can redistribute it and/or modify
-# it under the terms of the GNU General Public License as published by
-# the Free Software Foundation; either version 2 of the License, or
-# (at your option) any later version.
-#    
-#  This program is distributed in the hope that it will be useful,
-#  but WITHOUT ANY WARRANTY; without even the implied warranty of
-#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
-#  GNU General Public License for more details.
-#    
-#  You should have received a copy of the GNU General Public License
-#  along with this program; if not, write to the Free Software
-#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
-#    
-#  The author can be reached by email at:   
-#     bob@bobcowdery.plus.com
-#
-
-# Application imports
-from imports import *
-from defs import *
-import defs
-import graphics
-import persist
-import rotif
-import satif
-import rigif
-import cat
-
-"""
-    This is the GUI for the azimuth and elevation rotator. It provides both a direct
-    drive for manual use and an interface to a Satellite program that utilises the
-    Hamlib rotctld API.
-"""
-
-"""
-    Main class of the rotator controller GUI
-"""
-class RotUI(QMainWindow):
-    
-    #========================================================================================
-    # Constructor
-    def __init__(self, qt_app):
-        """
-        Constructor
-        
-        Arguments:
-            qt_app  --  the Qt appplication object
-            
-        """
-        
-        super(RotUI, self).__init__()
-        
-        # Get user settings
-        # There is no dialog to set these values so edit the settings file
-        # which is standard .ini format
-        self.__getSettings()
-        
-        # Get system configuration
-        # This is a pickled file so non-editable
-        config = persist.getSavedCfg(CONFIG_PATH)
-        if config != None:
-            defs.config = config
-        
-        # The application
-        self.__qt_app = qt_app
-        
-        # Set the back colour
-        palette = QtGui.QPalette()
-        palette.setColor(QtGui.QPalette.Background,QtGui.QColor(195,195,195,255))
-        self.setPalette(palette)
-
-        # Create graphics instances
-        self.__azpos = graphics.AzPos()
-        self.__elpos = graphics.ElPos()
-        
-        # Initialise the GUI
-        self.initUI()
-        
-        # Thread safe queues
-        self.__msgq = deque()
-        self.__cmdq = deque()
-        self.__evntq = deque()
-        self.__catq = deque()
-        
-        # Satellite rotator interface set when invoked
-        self.__satif = None
-        # Satellite rig interface set when invoked
-        self.__rigif = None
-        # CAT not running
-        self.__cat = None
-        self.__catState = OFFLINE
-        
-        # Tracking
-        self.__satTrackState = OFFLINE
-        self.__rigTrackState = OFFLINE
-        self.__rigTrackFreq = ()
-        self.__lastSatTrackState = OFFLINE
-        
-        # Startup state
-        self.__state = OFFLINE
-        self.__lastState = OFFLINE
-        self.__ping_timer = 0
-        self.__waitingMsg = False
-        
-        # Inhibit UI events
-        self.__inhibit = False
-    
-    #========================================================================================
-    # Get and update configuration
-    def __getSettings(self):
-        config = configparser.ConfigParser()
-        try:
-            config.read(SETTINGS_PATH)
-            if 'ARDUINO' in config:
-                arduino = config['ARDUINO']
-                defs.HW_RQST_IP = arduino['RQST_IP']
-                defs.HW_RQST_PORT = config.getint('ARDUINO', 'RQST_PORT')
-                if len(arduino['LOCAL_IP']) == 0 and platform.system().lower() == 'linux':
-                    defs.HW_LOCAL_IP = self.__get_ip()
-                else:
-                    defs.HW_LOCAL_IP = arduino['LOCAL_IP']
-                defs.HW_EVNT_PORT = config.getint('ARDUINO', 'EVNT_PORT')
-                defs.HW_TIMEOUT = config.getint('ARDUINO', 'HW_TIMEOUT')
-                defs.SAT_TIMEOUT = config.getint('ARDUINO', 'SAT_TIMEOUT')
-                defs.CAL_TIMEOUT = config.getint('ARDUINO', 'CAL_TIMEOUT')
-                defs.MOV_TIMEOUT = config.getint('ARDUINO', 'MOV_TIMEOUT')
-                defs.AZ_MOTOR_SPEED = config.getint('ARDUINO', 'AZ_MOTOR_SPEED')
-                defs.EL_MOTOR_SPEED = config.getint('ARDUINO', 'EL_MOTOR_SPEED')
-            else:
-                print('No ARDUINO section in settings, using defaults!')
-            if 'GPREDICT' in config:
-                gpredict = config['GPREDICT']
-                defs.SAT_IP = gpredict['BIND_IP']
-                defs.SAT_PORT = config.getint('GPREDICT', 'SAT_PORT')
-                defs.RIG_IP = gpredict['BIND_IP']
-                defs.RIG_PORT = config.getint('GPREDICT', 'RIG_PORT')
-            else:
-                print('No GPREDICT section in settings, using defaults!')
-            if 'CAT' in config:
-                cat = config['CAT']
-                defs.CAT_RIG = cat['RIG']
-                defs.CAT_PORT = cat['PORT']
-                defs.CAT_BAUD = config.getint('CAT', 'BAUD')
-            else:
-                print('No CAT section in settings, using defaults!')
-        except Exception as e:
-            print("Settings exception! [%s]" % str(e))
-    
-    # Return
-    def __get_ip(self):
-        """ Return our ip address """
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        try:
-            # doesn't even have to be reachable
-            s.connect(('10.255.255.255', 1))
-            IP = s.getsockname()[0]
-        except Exception:
-            IP = '127.0.0.1'
-        finally:
-            s.close()
-        return IP
-
-    #========================================================================================
-    # Run application here
-    def run(self, ):
-        """ Run the application """
-        
-        # Create and start the rotator interfaces
-        self.__rotif = rotif.RotIf(self.__rotState, self.__rotEvents, self.__cmdq, self.__msgq)
-        self.__rotif.start()
-        
-        # Start idle processing
-        QtCore.QTimer.singleShot(IDLE_TICKER, self.__idleProcessing)
-        
-        # Returns when application exits
-        # Show the GUI
-        self.show()
-        self.repaint()
-        self.logOutput.append('Attempting to connect to controller...')
-        
-        return self.__qt_app.exec_()
-    
-    #========================================================================================    
-    # UI initialisation and window event handlers
-    def initUI(self):
-        """ Configure the GUI interface """
-        
-        self.setToolTip('Rotator Control')
-        
-        # Arrange window
-        self.setGeometry(defs.config["Window"]["X"],
-                         defs.config["Window"]["Y"],
-                         defs.config["Window"]["W"],
-                         defs.config["Window"]["H"])
-                         
-        self.setWindowTitle('MiniSat Control')
-        
-        # Configure Menu
-        aboutAction = QAction(QtGui.QIcon('about.png'), '&About', self)        
-        aboutAction.setShortcut('Ctrl+A')
-        aboutAction.setStatusTip('About')
-        aboutAction.triggered.connect(self.about)
-        exitAction = QAction(QtGui.QIcon('exit.png'), '&Exit', self)        
-        exitAction.setShortcut('Ctrl+Q')
-        exitAction.setStatusTip('Quit application')
-        exitAction.triggered.connect(self.quit)
-        
-        menubar = self.menuBar()
-        fileMenu = menubar.addMenu('&File')
-        fileMenu.addAction(exitAction)
-        helpMenu = menubar.addMenu('&Help')
-        helpMenu.addAction(aboutAction)
-        
-        self.__makeWidgets()
-    
-    #=======================================================
-    # Construct and layout all widgets
-    #=======================================================
-    def __makeWidgets(self):
-        
-        #=======================================================
-        # Set main layout
-        w = QWidget()
-        self.setCentralWidget(w)
-        self.__grid = QGridLayout()
-        w.setLayout(self.__grid)
-        
-        #=======================================================
-        # Populate main grid
-        self.__popMain(self.__grid)
-        
-        #=======================================================
-        # Create a status grid bottom left of main grid
-        self.__statusGrid = QGridLayout()
-        box1 = QGroupBox('Status')
-        box1.setLayout(self.__statusGrid)
-        # Add panel to status grid
-        self.__grid.addWidget(box1, 4, 2, 1, 1)
-        
-        #=======================================================
-        # Populate status grid
-        self.__popStatus(self.__statusGrid)
-        
-        #=======================================================
-        # Create an interactor grid left side of main grid
-        self.__interactorGrid = QGridLayout()
-        box2 = QGroupBox('Control Panel')
-        box2.setLayout(self.__interactorGrid)
-        # Add panel to main grid
-        self.__grid.addWidget(box2, 0, 0, 4, 1)
-        # This sets all labels in the control panel
-        box2.setStyleSheet("QLabel{color: rgb(172,63,26);}")
-        
-        #=======================================================
-        # Within the interactor grid add another grid to hold
-        # the rotator control interactors
-        self.__rotGrid = QGridLayout()
-        box3 = QGroupBox('Rotator Control')
-        box3.setLayout(self.__rotGrid)
-        # Add rot grid to top grid
-        self.__interactorGrid.addWidget(box3, 0, 0)
-        
-        #=======================================================
-        # Within the rotator grid add a second grid to hold
-        # the nudge controls
-        self.__nudgeGrid = QGridLayout()
-        box4 = QFrame()
-        box4.setLayout(self.__nudgeGrid)
-        # Add nudge grid to rotator grid
-        # Occupies row 1 and 5 cols
-        self.__rotGrid.addWidget(box4, 1, 0, 1, 5)
-        
-        # Add another grid tgo hold the tracking controls
-        # the tracking widgets so they can be spaces properly
-        self.__trackGrid = QGridLayout()
-        box5 = QFrame()
-        box5.setLayout(self.__trackGrid)
-        # Add track grid to rotator grid
-        # Occupies row 2 and 5 cols
-        self.__rotGrid.addWidget(box5, 2, 0, 1, 5)
-        
-        #=======================================================
-        # Populate the rotator grid
-        self.__popRotator(self.__rotGrid, self.__nudgeGrid, self.__trackGrid)
-        
-        #=======================================================
-        # Within the interactor grid add a second grid to hold
-        # the rig control interactors
-        self.__rigGrid = QGridLayout()
-        box5 = QGroupBox('Rig Control')
-        box5.setLayout(self.__rigGrid)
-        # Add rig grid to side grid
-        # Occupies row 3 and 2 cols
-        self.__interactorGrid.addWidget(box5, 1, 0)
-        
-        #=======================================================
-        # Within the rig grid add a second grid to hold
-        # the check boxes so they can be spaces properly
-        self.__catGrid = QGridLayout()
-        box6 = QFrame()
-        box6.setLayout(self.__catGrid)
-        # Add rig grid to side grid
-        # Occupies row 3 and 2 cols
-        self.__rigGrid.addWidget(box6, 0, 0, 1, 6)
-        
-        #=======================================================
-        # Populate the rig grid
-        self.__popRig(self.__rigGrid, self.__catGrid)
-        
-        #=======================================================
-        # Add quit button to the interactor grid
-        self.quitbtn = QPushButton('Exit')
-        self.__interactorGrid.addWidget(self.quitbtn, 5, 0)
-        self.quitbtn.clicked.connect(self.__onQuit)
-    
-    #=======================================================
-    # Populate main grid
-    #=======================================================
-    def __popMain(self, grid):
-    
-        # Graphics
-        grid.addWidget(self.__azpos, 0, 1, 2, 2)
-        grid.addWidget(self.__elpos, 2, 1, 2, 2)
-        
-        # Messages
-        self.logOutput = QTextEdit()
-        self.logOutput.setReadOnly(True)
-        self.logOutput.setLineWrapMode(QTextEdit.NoWrap)
-        font = self.logOutput.font()
-        font.setFamily("Courier")
-        font.setPointSize(10)
-        grid.addWidget(self.logOutput, 4, 0, 1, 3)
-        self.logOutput.setFixedHeight(110)
-        self.logOutput.setFixedWidth(400)
-    
-    #=======================================================
-    # Populate status grid
-    #=======================================================
-    def __popStatus(self, grid):
-        contlabel = QLabel('Controller')
-        grid.addWidget(contlabel, 0, 0)
-        self.contInd = QFrame()
-        self.contInd.setStyleSheet('background-color: red')
-        self.contInd.setFixedHeight(10)
-        self.contInd.setFixedWidth(10)
-        grid.addWidget(self.contInd, 0, 1)
-        
-        callabel = QLabel('Calibration')
-        grid.addWidget(callabel, 1, 0)
-        self.calInd = QFrame()
-        self.calInd.setStyleSheet('background-color: red')
-        self.calInd.setFixedHeight(10)
-        self.calInd.setFixedWidth(10)
-        grid.addWidget(self.calInd, 1, 1)
-        
-        satlabel = QLabel('Sat Track')
-        grid.addWidget(satlabel, 2, 0)
-        self.satInd = QFrame()
-        self.satInd.setStyleSheet('background-color: red')
-        self.satInd.setFixedHeight(10)
-        self.satInd.setFixedWidth(10)
-        grid.addWidget(self.satInd, 2, 1)
-        
-        riglabel = QLabel('Rig Track')
-        grid.addWidget(riglabel, 3, 0)
-        self.rigInd = QFrame()
-        self.rigInd.setStyleSheet('background-color: red')
-        self.rigInd.setFixedHeight(10)
-        self.rigInd.setFixedWidth(10)
-        grid.addWidget(self.rigInd, 3, 1)
-        
-        catlabel = QLabel('CAT')
-        grid.addWidget(catlabel, 4, 0)
-        self.catInd = QFrame()
-        self.catInd.setStyleSheet('background-color: red')
-        self.catInd.setFixedHeight(10)
-        self.catInd.setFixedWidth(10)
-        
-        grid.addWidget(self.catInd, 4, 1)
-        
-    #=======================================================
-    # Populate Rotator grid
-    #=======================================================
-    def __popRotator(self, rotgrid, nudgegrid, trackgrid):
-        # Calibration
-        self.calibratebtn = QPushButton('(re)Calibrate')
-        rotgrid.addWidget(self.calibratebtn, 0, 0, 1, 2)
-        self.calibratebtn.clicked.connect(self.__onCalibrate)
-        
-        # Home
-        self.homebtn = QPushButton('Home')
-        rotgrid.addWidget(self.homebtn, 0, 3, 1, 2)
-        self.homebtn.clicked.connect(self.__onHome)
-        
-        # Nudge
-        nudgefwdlabel = QLabel('Fwd')
-        nudgegrid.addWidget(nudgefwdlabel, 0, 0)
-        self.nudgefwdrb = QRadioButton('')
-        nudgegrid.addWidget(self.nudgefwdrb, 0, 1)
-        self.nudgefwdrb.setChecked(True)
-        nudgerevlabel = QLabel('Rev')
-        nudgegrid.addWidget(nudgerevlabel, 0, 2)
-        self.nudgerevrb = QRadioButton('')
-        nudgegrid.addWidget(self.nudgerevrb, 0, 3)
-        
-        self.nudgeazbtn = QPushButton('Nudge Az')
-        nudgegrid.addWidget(self.nudgeazbtn, 0, 4)
-        self.nudgeazbtn.clicked.connect(self.__onNudgeAz)
-        #self.nudgeazbtn.setStyleSheet("color: red; font: 14px")
-        self.nudgeelbtn = QPushButton('Nudge El')
-        nudgegrid.addWidget(self.nudgeelbtn, 0, 5)
-        self.nudgeelbtn.clicked.connect(self.__onNudgeEl)
-        
-        # Tracking
-        trackinglabel = QLabel('Track Satelite')
-        trackgrid.addWidget(trackinglabel, 0, 0)
-        self.rottrackcb = QCheckBox('')
-        self.rottrackcb.stateChanged.connect(self.__trackChanged)
-        trackgrid.addWidget(self.rottrackcb, 0, 1)
-        # Actual values to move to
-        self.trackazlabel = QLabel('Az:')
-        trackgrid.addWidget(self.trackazlabel, 0, 2)
-        self.trackazvalue = QLabel('---')
-        self.trackazvalue.setStyleSheet("color: green; font: 14px")
-        trackgrid.addWidget(self.trackazvalue, 0, 3)
-        self.trackellabel = QLabel('El:')
-        trackgrid.addWidget(self.trackellabel, 0, 4)
-        self.trackelvalue = QLabel('---')
-        self.trackelvalue.setStyleSheet("color: green; font: 14px")
-        trackgrid.addWidget(self.trackelvalue, 0, 5)
-        
-        # Azimuth
-        azimuthlabel = QLabel('Azimuth')
-        rotgrid.addWidget(azimuthlabel, 3, 0)
-        self.azimuthtxt = QSpinBox()
-        self.azimuthtxt.setRange(0, 359)
-        self.azimuthtxt.setToolTip('0-360 Deg')
-        self.azimuthtxt.setMaximumWidth(100)
-        rotgrid.addWidget(self.azimuthtxt, 3, 1)
-        self.azimuthbtn = QPushButton('Move')
-        self.azimuthbtn.setMaximumWidth(50)
-        rotgrid.addWidget(self.azimuthbtn, 3, 2)
-        self.azimuthbtn.clicked.connect(self.__onAzimuth)
-        azimuthlabel = QLabel('Current')
-        rotgrid.addWidget(azimuthlabel, 3, 3)
-        self.azimuthvallabel = QLabel('---')
-        self.azimuthvallabel.setStyleSheet("color: red; font: 14px")
-        rotgrid.addWidget(self.azimuthvallabel, 3, 4)
-        
-        # Elevation
-        elevationlabel = QLabel('Elevation')
-        rotgrid.addWidget(elevationlabel, 4, 0)
-        self.elevationtxt = QSpinBox()
-        self.elevationtxt.setRange(0, 90)
-        self.elevationtxt.setToolTip('0-90 Deg')
-        self.elevationtxt.setMaximumWidth(100)
-        rotgrid.addWidget(self.elevationtxt, 4, 1)
-        self.elevationbtn = QPushButton('Move')
-        self.elevationbtn.setMaximumWidth(50)
-        rotgrid.addWidget(self.elevationbtn, 4, 2)
-        self.elevationbtn.clicked.connect(self.__onElevation)
-        elevationlabel = QLabel('Current')
-        rotgrid.addWidget(elevationlabel, 4, 3)
-        self.elevationvallabel = QLabel('--')
-        self.elevationvallabel.setStyleSheet("color: red; font: 14px")
-        rotgrid.addWidget(self.elevationvallabel, 4, 4)
-    
-    #=======================================================
-    # Populate rig grid
-    #=======================================================
-    def __popRig(self, rigGrid, catGrid):
-
-        # CAT and track section
-        catlabel = QLabel('CAT Enable')
-        catGrid.addWidget(catlabel, 0, 0)
-        self.catcb = QCheckBox('')
-        self.catcb.stateChanged.connect(self.__catChanged)
-        catGrid.addWidget(self.catcb, 0, 1)
-
-        tracklabel = QLabel('Track Freq')
-        catGrid.addWidget(tracklabel, 0, 2)
-        self.rigtrackcb = QCheckBox('')
-        self.rigtrackcb.stateChanged.connect(self.__rigTrackChanged)
-        self.__catGrid.addWidget(self.rigtrackcb, 0, 3)
-        
-        # Allow manual PTT
-        pttlabel = QLabel('PTT')
-        catGrid.addWidget(pttlabel, 0, 4)
-        self.pttcb = QCheckBox('')
-        self.pttcb.stateChanged.connect(self.__pttChanged)
-        self.__catGrid.addWidget(self.pttcb, 0, 5)
-        
-        # Indicator for rig in TX
-        self.txInd = QFrame()
-        self.txInd.setStyleSheet('background-color: green')
-        self.txInd.setFixedHeight(10)
-        self.txInd.setFixedWidth(10)
-        catGrid.addWidget(self.txInd, 0, 6)
-        
-        # Frequency and mode section
-        # RX freq
-        rigrxlabel = QLabel('RX')
-        rigGrid.addWidget(rigrxlabel, 1, 0)
-        self.__rigrx = QLineEdit('000.000.000')
-        self.__rigrx.setInputMask('999.999.999')
-        self.__rigrx.setStyleSheet('background-color: rgb(151,168,168); font: 20px;')
-        rigGrid.addWidget(self.__rigrx, 1, 1, 1, 2)
-        self.__rigrx.setMaximumWidth(120)
-        
-        self.setrxfbtn = QPushButton('Set')
-        rigGrid.addWidget(self.setrxfbtn, 1, 4)
-        self.setrxfbtn.clicked.connect(self.__onSetRxFreq)
-        self.setrxfbtn.setMaximumWidth(50)
-        
-        # TX freq
-        rigtxlabel = QLabel('TX')
-        rigGrid.addWidget(rigtxlabel, 2, 0)
-        self.__rigtx = QLineEdit('000.000.000')
-        self.__rigtx.setInputMask('999.999.999')
-        self.__rigtx.setStyleSheet('background-color: rgb(151,168,168); font: 20px;')
-        rigGrid.addWidget(self.__rigtx, 2, 1, 1, 2)
-        self.__rigtx.setMaximumWidth(120)
-        
-        self.settxfbtn = QPushButton('Set')
-        rigGrid.addWidget(self.settxfbtn, 2, 4)
-        self.settxfbtn.clicked.connect(self.__onSetTxFreq)
-        self.settxfbtn.setMaximumWidth(50)
-        
-        # Mode
-        rigmodelabel = QLabel('Mode')
-        rigGrid.addWidget(rigmodelabel, 3, 0)
-        self.__rigmodesel = QComboBox()
-        self.__rigmodesel.addItems(['LSB','USB','FM'])
-        self.__rigmodesel.setStyleSheet('background-color: rgb(151,168,168); font: 14px;')
-        rigGrid.addWidget(self.__rigmodesel, 3, 1, 1, 2)
-        self.__rigmodesel.setMaximumWidth(120)
-        
-        self.setmodebtn = QPushButton('Set')
-        rigGrid.addWidget(self.setmodebtn, 3, 4)
-        self.setmodebtn.clicked.connect(self.__onSetMode)
-        self.setmodebtn.setMaximumWidth(50)
-        
-    #========================================================================================
-    # UI Event Handling
-    def about(self):
-        """ User hit about """
-        
-        text = """
-Azimuth and Elevation Controller
-
-    by Bob Cowdery (G3UKB)
-    email:  bob@bobcowdery.plus.com
-"""
-        QMessageBox.about(self, 'About', text)
-    
-    # Window events
-    def close(self):
-                        
-        # Close
-        if self.__cat != None:
-            self.__cat.terminate()
-
-        if self.__rotif != None:
-            self.__rotif.terminate()
-            self.__rotif.join()
-
-        if self.__satif != None:
-            self.__satif.terminate()
-            self.__satif.join()
-
-        if self.__rigif != None:
-            self.__rigif.terminate()
-            self.__rigif.join()
-    
-        # Save configuration
-        persist.saveCfg(CONFIG_PATH, defs.config)
-        
-        # Final check as Python does not terminate unless all tasks are terminated
-        # We do not clean up automatically as this is a bug that needs fixing.
-        tasks = threading.enumerate()
-        if len(tasks) > 1:
-            print("Some tasks have not terminated! ,", tasks)
-         
-    def quit(self):
-        """ User hit quit """
-        
-        # Close
-        self.close()
-        sys.exit()
-        
-    def closeEvent(self, event):
-        """
-        User hit x
-        
-        Arguments:
-            event   -- ui event object
-            
-        """
-        
-        # Be polite, ask user
-        reply = QMessageBox.question(self, 'Quit?',
-            "Quit application?", QMessageBox.Yes | 
-            QMessageBox.No, QMessageBox.No)
-        if reply == QMessageBox.Yes:
-            self.close()
-        else:
-            event.ignore()
-    
-    def __onQuit(self):
-        """ Quit application """
-        self.quit()
-    
-    def resizeEvent(self, event):
-        # Update config
-        defs.config["Window"]["W"] = event.size().width()
-        defs.config["Window"]["H"] = event.size().height()
-    
-    def moveEvent(self, event):
-        # Update config
-        defs.config["Window"]["X"] = event.pos().x()
-        defs.config["Window"]["Y"] = event.pos().y()
-
-    #========================================================================================
-    # Activation events
-    
-    def __onCalibrate(self):
-        """ Run azimuth and elevation calibration """
-        self.__msgq.append('Calibrating motors... please wait!')
-        self.__cmdq.append(("coldstart", []))
-    
-    def __onHome(self):
-        """ Go to home """
-        self.__cmdq.append(("homeAz", []))
-        self.__cmdq.append(("homeEl", []))
-    
-    def __onNudgeAz(self):
-        """ Move Az forward a tad """
-        if self.nudgefwdrb.isChecked():
-            self.__cmdq.append(("nudgeazfwd", []))
-        else:
-            self.__cmdq.append(("nudgeazrev", []))
-    
-    def __onNudgeEl(self):
-        """ Move El forward a tad  """
-        if self.nudgefwdrb.isChecked():
-            self.__cmdq.append(("nudgeelfwd", []))
-        else:
-            self.__cmdq.append(("nudgeelrev", []))
-
-    def __onAzimuth(self):
-        """ Move to new azimuth """
-        try:
-            if len(self.azimuthtxt.text()) > 0:
-                azimuth = int(self.azimuthtxt.text())
-            # Set the position
-            self.__cmdq.append(("setPosAz", [azimuth]))
-        except ValueError:
-            self.logOutput.append('Bad azimuth position [%s]' % (self.azimuthtxt.text()))
-    
-    def __onElevation(self):
-        """ Move to new elevation """
-        try:
-            if len(self.elevationtxt.text()) > 0:
-                elevation = int(self.elevationtxt.text())
-            # Set the position
-            self.__cmdq.append(("setPosEl", [elevation]))
-        except ValueError:
-            self.logOutput.append('Bad elevation position [%s]' % (self.elevationtxt.text()))
-            
-    def __trackChanged(self):
-        """ Antenna tracking changed """
-        if self.rottrackcb.isChecked():
-            if self.__satif != None:
-                self.__satif.terminate()
-                self.__satif.join()
-                self.__satif = None
-            # Create the sat interface
-            self.__satif = satif.SatIf(self.__satStatus, self.__satPosition, self.__cmdq, self.__msgq)
-            self.__satif.start()
-        else:
-            if self.__satif != None:
-                self.__satif.terminate()
-                self.__satif.join()
-                self.__satif = None
-    
-    def __catChanged(self):
-        # Create and run the CAT instance
-        # The operating is async
-        # 1. Receive command from sat control application or UI
-        # 2. Forward command to serial port (tranceiver)
-        # 3. Receive a CAT response from serial port which arrives at the callback
-        # 4. Send response to the sat control application and/or update UI
-        if self.__inhibit: return
-        if self.catcb.isChecked():
-            if self.__cat == None:
-                # Run CAT
-                self.__cat = cat.CAT(defs.CAT_RIG, defs.CAT_PORT, defs.CAT_BAUD, self.__catq, self.__msgq)
-                if self.__cat.run():
-                    self.__catState = ONLINE
-                else:
-                    # Failed to start CAT
-                    self.__cat.terminate()
-                    self.__cat = None
-                    self.__catState = OFFLINE
-        else:
-            if self.__cat != None:
-                # Stop CAT
-                self.__cat.terminate()
-                self.__cat = None
-                self.__catState = OFFLINE
-        
-    def __rigTrackChanged(self):
-        if self.__inhibit: return
-        if self.__cat == None:
-            # Run CAT
-            self.__cat = cat.CAT(defs.CAT_RIG, defs.CAT_PORT, defs.CAT_BAUD, self.__catq, self.__msgq)
-            if self.__cat.run():
-                self.__catState = ONLINE
-            else:
-                # Failed to start CAT
-                self.__cat.terminate()
-                self.__cat = None
-                self.__catState = OFFLINE
-                self.rigtrackcb.setChecked(False)
-                return
-        
-        if self.rigtrackcb.isChecked():
-            if self.__rigif != None:
-                self.__rigif.terminate()
-                self.__rigif.join()
-                self.__rigif = None
-            # Create the rig interface
-            self.__rigif = rigif.RigIf(self.__cat, self.__catq, self.__rigStatus, self.__rigFreq, self.__msgq)
-            self.__rigif.start()
-        else:
-            if self.__rigif != None:
-                self.__rigif.terminate()
-                self.__rigif.join()
-                self.__rigif = None
-    
-    def __onSetRxFreq(self):
-        # Manually set the RX frequency
-        if self.__cat != None:
-            t = self.__rigrx.text().split('.')
-            f = (int(t[0])*1000000 + int(t[1])*1000 + int(t[2]))
-            self.__cat.do_command(CAT_FREQ_SET, str(f))
-    
-    def __onSetTxFreq(self):
-        # Manually set the TX frequency
-        if self.__cat != None:
-            t = self.__rigtx.text().split('.')
-            f = (int(t[0])*1000000 + int(t[1])*1000 + int(t[2]))
-            self.__cat.do_command(CAT_FREQ_SET, str(f))
-    
-    def __onSetMode(self):
-        # Manually set mode
-        self.__cat.do_command(CAT_MODE_SET, self.__rigmodesel.currentText())
-    
-    def __pttChanged(self):
-        # Manually set PTT
-        # This has to be handled by the rig interface
-        if self.pttcb.isChecked():
-            self.__rigif.manualSetPtt(True)
-        else:
-            self.__rigif.manualSetPtt(False)
-    
-    #========================================================================================
-    # Callbacks
-    def __rotState(self, state):
-        """
-        Receives state updates
-        
-        """
-        self.__state = state
-        
-    def __rotEvents(self, what, value):
-        """
-        Receives position events on the rotif thread
-        
-        Arguments:
-            what    --  az|el
-            value   --  degrees
-        """
-        
-        self.__evntq.append((what, value))
-        
-    def __satStatus(self, state):
-        """
-        Receives sat connect state updates
-        
-        """
-        self.__satTrackState = state
-    
-    def __satPosition(self, azimuth, elevation):
-        """
-        Receives sat position for display
-        
-        """
-        
-        self.trackazvalue.setText(str(azimuth))
-        self.trackelvalue.setText(str(elevation))
-        
-    def __rigStatus(self, state):
-        """
-        Receives rig connect state updates
-        
-        """
-        self.__rigTrackState = state
-    
-    def __rigFreq(self, mode, freq):
-        """
-        Receives rig frequency updates
-        
-            mode    --  RX/TX
-            freq    --  current tracking frequency
-        
-        """
-        self.__rigTrackFreq = (mode, freq)
-        
-    #========================================================================================
-    # Idle time processing 
-    def __idleProcessing(self):
-        
-        """
-        Idle processing.
-        Called every 100ms single shot
-        
-        """
-        # Empty the message q
-        while len(self.__msgq) > 0:
-            t = self.__msgq.popleft()
-            if "error" in t.lower():
-                if self.__state == ONLINE:
-                    # Output error messages only if online
-                    if "error" in t.lower():
-                        self.logOutput.setTextColor(QColor("red"))
-                else:
-                    # Offline
-                    if not self.__waitingMsg:
-                        self.logOutput.setTextColor(QColor("green"))
-                        self.logOutput.append("Waiting for controller to come on-line...")
-                        self.__waitingMsg = True
-            
-            else:
-                if "info" in t.lower():
-                    self.logOutput.setTextColor(QColor("green"))
-                else:
-                    self.logOutput.setTextColor(QColor("black"))
-                self.logOutput.append(t)
-            
-        # Empty the event q
-        self.__processEventQ()
-        
-        # Adjust interface
-        self.__setContext()
-        
-        # Check and action according to startup state
-        self.__checkState()
-        
-        # Check SAT tracking state
-        self.__checkSatTrack()
-        
-        # Check CAT and Rig Track state
-        self.__checkCATTrackState()
-        
-        # Update TX indicator
-        self.__updateTXInd()
-        
-        # Set next tick
-        QtCore.QTimer.singleShot(IDLE_TICKER, self.__idleProcessing)
-    
-    # Process event q
-    def __processEventQ(self):
-        # Empty the event q
-        try:
-            if self.__state == ONLINE:
-                while len(self.__evntq) > 0:
-                    pos = self.__evntq.popleft()
-                    if pos[0] == 'az':
-                        self.azimuthvallabel.setText(str(pos[1]))
-                        self.__azpos.setHeading(pos[1])
-                    elif pos[0] == 'el':
-                        self.elevationvallabel.setText(str(pos[1]))
-                        self.__elpos.setElevation(pos[1])
-            else:
-                self.azimuthvallabel.setText('---')
-                self.elevationvallabel.setText('--')
-        except Exception:
-            self.__msgq.append("Error updating position!")
-            
-    # Context processing
-    def __setContext(self):
-        
-        """
-        Called every 100ms from idle processing.
-        Adjust all interactore to reflect current context.
-        
-        """
-        # Exit is always enabled.
-        self.quitbtn.setEnabled(True)
-        #
-        # If the controller is on-line then -
-        #   All Rotator Control is enabled.
-        #   All Rig Control is enabled.
-        if self.__state == ONLINE:
-            self.__rotatorContext(ENABLE)
-            self.__rigContext(ENABLE)
-        #
-        # If we are in manual allow manual controls    
-        elif self.__state == CAL_MANUAL:
-            self.calibratebtn.setEnabled(True)
-            self.homebtn.setEnabled(False)
-            self.nudgefwdrb.setEnabled(True)
-            self.nudgerevrb.setEnabled(True)
-            self.nudgeazbtn.setEnabled(True)
-            self.nudgeelbtn.setEnabled(True)
-        #
-        # If the controller is off-line then -
-        #   All Rotator Control is disabled except track so we can test tracking.
-        #   All Rig control is enabled, even tracking,
-        #   although the antenna obviously won't follow.
-        else:
-            self.__rotatorContext(DISABLE)
-            self.rottrackcb.setEnabled(True)
-            self.__rigContext(ENABLE)
-        #
-        # Sub context -
-        #   If Rotator Control Track is set then -
-        #       Manual control is inhibited
-        if self.rottrackcb.isChecked():
-            self.calibratebtn.setEnabled(False)
-            self.homebtn.setEnabled(False)
-            self.nudgefwdrb.setEnabled(False)
-            self.nudgerevrb.setEnabled(False)
-            self.nudgeazbtn.setEnabled(False)
-            self.nudgeelbtn.setEnabled(False)
-            self.azimuthtxt.setEnabled(False)
-            self.azimuthbtn.setEnabled(False)
-            self.elevationtxt.setEnabled(False)
-            self.elevationbtn.setEnabled(False)
-        # Sub context -
-        #   If Rig Control Track is set and CAT is not set then -
-        #       CAT will be automatically set and then disabled.
-        #   If Rig Control track is unset then CAT will be left
-        #   in its previous state after its enabled.
-        if self.rigtrackcb.isChecked():
-            self.pttcb.setEnabled(True)
-            self.catcb.setEnabled(False)
-            self.__rigrx.setEnabled(False)
-            self.setrxfbtn.setEnabled(False)
-            self.__rigtx.setEnabled(False)
-            self.settxfbtn.setEnabled(False)
-            self.__rigmodesel.setEnabled(True)
-            self.setmodebtn.setEnabled(True)
-        elif self.catcb.isChecked():
-            self.pttcb.setEnabled(False)
-            self.catcb.setEnabled(True)
-            self.__rigrx.setEnabled(True)
-            self.setrxfbtn.setEnabled(True)
-            self.__rigtx.setEnabled(True)
-            self.settxfbtn.setEnabled(True)
-            self.__rigmodesel.setEnabled(True)
-            self.setmodebtn.setEnabled(True)
-        else:
-            self.pttcb.setEnabled(False)
-            self.__rigrx.setEnabled(False)
-            self.setrxfbtn.setEnabled(False)
-            self.__rigtx.setEnabled(False)
-            self.settxfbtn.setEnabled(False)
-            self.__rigmodesel.setEnabled(False)
-            self.setmodebtn.setEnabled(False)
-                       
-    # Rotator Context
-    def __rotatorContext(self, state):
-        if state == DISABLE:
-            state = False
-        else:
-            state = True
-         
-        self.calibratebtn.setEnabled(state)
-        self.homebtn.setEnabled(state)
-        self.nudgefwdrb.setEnabled(state)
-        self.nudgerevrb.setEnabled(state)
-        self.nudgeazbtn.setEnabled(state)
-        self.nudgeelbtn.setEnabled(state)
-        self.azimuthtxt.setEnabled(state)
-        self.azimuthbtn.setEnabled(state)
-        self.elevationtxt.setEnabled(state)
-        self.elevationbtn.setEnabled(state)
-
-    # Rig Context
-    def __rigContext(self, state):
-        if state == DISABLE:
-            state = False
-        else:
-            state = True    
-        self.catcb.setEnabled(state)
-        self.rigtrackcb.setEnabled(state)
-        self.pttcb.setEnabled(state)
-        self.__rigrx.setEnabled(state)
-        self.setrxfbtn.setEnabled(state)
-        self.__rigtx.setEnabled(state)
-        self.settxfbtn.setEnabled(state)
-        self.__rigmodesel.setEnabled(state)
-        self.setmodebtn.setEnabled(state)
-    
-    # Action according to startup state 
-    def __checkState(self):
-        # State check
-        if self.__ping_timer == 0:
-            # Time for a state check
-            if self.__state == OFFLINE:
-                # Queue a poll to see if we are connected
-                self.__cmdq.append(("poll", []))
-                self.contInd.setStyleSheet('background-color: red')
-                self.calInd.setStyleSheet('background-color: red')
-                if self.__lastState != OFFLINE:
-                    self.__msgq.append('Controller has gone offline!')
-            elif self.__state == PENDING:
-                if self.__lastState != PENDING:
-                    # Poll success so try a coldstart if we have calibration data
-                    if ("AZ" in defs.config["Calibration"]) and ("EL" in defs.config["Calibration"]):
-                        self.__cmdq.append(("coldstart", []))
-                        self.__msgq.append('Controller is online pending a coldstart')
-                        self.contInd.setStyleSheet('background-color: rgb(199,94,44)')
-                    else:
-                        msg = QMessageBox()
-                        msg.setWindowTitle("Action")
-                        msg.setIcon(QMessageBox.Information)
-                        msg.setText("Calibration required!")
-                        msg.setInformativeText("The controller cannot fully start without calibration data.")
-                        msg.setDetailedText(
-"""
-Please click the calibration button to perform a full calibration.
-For initial testing use the nudge buttons to verify operation of the motors in the correct direction and the corresponding limit switches. Manually operate the forward and reverse limit switches to prevent movement.
-"""
-                        )
-                        msg.setStandardButtons(QMessageBox.Ok)
-                        msg.exec_()
-                        self.contInd.setStyleSheet('background-color: rgb(199,94,44)')
-                        self.__state = CAL_MANUAL
-                        self.__msgq.append('Waiting for manual calibration...')
-            elif self.__state == STARTING_CAL:
-                self.__msgq.append('Starting calibration...')
-                self.calInd.setStyleSheet('background-color: rgb(199,94,44)')
-            elif self.__state == ONLINE:
-                if self.__lastState != ONLINE:
-                    self.__msgq.append('Calibration successful, controller online')
-                    self.contInd.setStyleSheet('background-color: green')
-                    self.calInd.setStyleSheet('background-color: green')
-                    if  not self.__rotif.isPos():
-                       self.__msgq.append('Info - position is unknown use Home or a Move command')
-                # Check if still on line
-                self.__cmdq.append(("isonline", []))
-            elif self.__state == CAL_FAILED:
-                self.__msgq.append('Calibration failed, continuing to try every 5s.')
-                self.__state = OFFLINE
-                self.contInd.setStyleSheet('background-color: rgb(199,94,44)')
-                self.calInd.setStyleSheet('background-color: red')
-            elif self.__state == CAL_MANUAL:
-                # Wait state for manual calibration  
-                pass 
-            else:
-                self.__msgq.append('Invalid state %d!' % self.__state)
-            if self.__state == OFFLINE or self.__state == PENDING:
-                self.__ping_timer = PING_TICKER_1
-            else:
-                self.__ping_timer = PING_TICKER_2
-            self.__lastState = self.__state
-        else:
-            self.__ping_timer -= 1
-    
-    # Action Sat tracking connection state
-    def __checkSatTrack(self):
-        if self.__satTrackState == OFFLINE:
-            self.satInd.setStyleSheet('background-color: red')
-            if self.__lastSatTrackState == ONLINE:
-                # Just gone offline so uncheck
-                self.rottrackcb.setChecked(False)
-                self.trackazvalue.setText('---')
-                self.trackelvalue.setText('--')
-        elif self.__satTrackState == FAILED:
-            self.satInd.setStyleSheet('background-color: red')
-        elif self.__satTrackState == WAITING:
-            self.satInd.setStyleSheet('background-color: rgb(199,94,44)')
-        elif self.__satTrackState == ONLINE:
-            self.satInd.setStyleSheet('background-color: green')
-        # Remember last state
-        self.__lastSatTrackState = self.__satTrackState
-        
-    # Action CAT and rig tracking connection state
-    def __checkCATTrackState(self):
-        # Check CAT
-        self.__inhibit = True
-        if self.__catState == OFFLINE:
-            self.catInd.setStyleSheet('background-color: red')
-            self.catcb.setChecked(False)
-            if self.__cat != None:
-                # Stop CAT
-                self.__cat.terminate()
-                self.__cat = None
-                self.__catState = OFFLINE
-        elif self.__catState == ONLINE:
-            self.catInd.setStyleSheet('background-color: green')
-            self.catcb.setChecked(True)
-        # Check tracking
-        if self.__rigTrackState == OFFLINE:
-            self.rigInd.setStyleSheet('background-color: red')
-            # If just gone offline wait for it to die
-            if self.__rigif != None:
-                self.__msgq.append('Waiting for rig tracking to terminate...')
-                while self.__rigif.isAlive():
-                    sleep(0.1)
-                self.__rigif = None
-            self.rigtrackcb.setChecked(False)
-        elif self.__rigTrackState == FAILED:
-            self.rigInd.setStyleSheet('background-color: red')
-            # If just failed wait for it to die
-            if self.__rigif != None:
-                self.__msgq.append('Waiting for rig tracking to terminate...')
-                while self.__rigif.isAlive():
-                    sleep(0.1)
-                self.__msgq.append('Rig tracking terminated')
-                self.__rigif = None
-            self.rigtrackcb.setChecked(False)
-        elif self.__rigTrackState == WAITING:
-            self.rigInd.setStyleSheet('background-color: rgb(199,94,44)')
-        elif self.__rigTrackState == ONLINE:
-            self.rigInd.setStyleSheet('background-color: green')
-            if len(self.__rigTrackFreq) > 0:
-                self.__updateFreq(self.__rigTrackFreq)
-        
-        self.__inhibit = False
-    
-    # Update the displayed freq
-    def __updateFreq(self, freq):
-        mode, freq = freq
-        # Frequency is string in Hz
-        # Make it a 9 digit string
-        fs = freq.zfill(9)
-        if mode == RX:
-            # Update RX freq
-            self.__rigrx.setText(fs)
-        else:
-            # Update TX freq
-            self.__rigtx.setText(fs)
-    
-    # Set TX indicator according to actual rig TX state       
-    def __updateTXInd(self):
-        if self.__rigif != None:
-            if self.__rigif.getRigPtt():
-                self.txInd.setStyleSheet('background-color: red')
-            else:
-                self.txInd.setStyleSheet('background-color: green')
+#!/usr/bin/env python3
+#
+# rotui.py
+# 
+# Copyright (C) 2020 by G3UKB Bob Cowdery
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#    
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#    
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#    
+#  The author can be reached by email at:   
+#     bob@bobcowdery.plus.com
+#
+
+# Application imports
+from imports import *
+from defs import *
+import defs
+import graphics
+import persist
+import rotif
+import satif
+import rigif
+import cat
+
+"""
+    This is the GUI for the azimuth and elevation rotator. It provides both a direct
+    drive for manual use and an interface to a Satellite program that utilises the
+    Hamlib rotctld API.
+"""
+
+"""
+    Update event posted to the GUI thread by the worker threads.
+    Qt marshals posted events onto the GUI thread so the handler can
+    touch widgets directly, with no queue to drain on a timer tick.
+"""
+_UPDATE_EVENT = QtCore.QEvent.Type(QtCore.QEvent.registerEventType())
+
+# Icons are decoded once and shared on any further request for the name
+_ICONS = {}
+
+def _icon(name):
+    return _ICONS.setdefault(name, QtGui.QIcon(name))
+
+class _UpdateEvent(QtCore.QEvent):
+
+    def __init__(self, what, value):
+        """
+        Constructor
+
+        Arguments:
+            what    --  az|el|sat
+            value   --  degrees or (azimuth, elevation)
+        """
+        super(_UpdateEvent, self).__init__(_UPDATE_EVENT)
+        self.what = what
+        self.value = value
+
+"""
+    Runs a shutdown callable on the global thread pool so the GUI
+    thread is not blocked joining an interface thread
+"""
+class _ShutdownTask(QtCore.QRunnable):
+
+    def __init__(self, fn):
+        """
+        Constructor
+
+        Arguments:
+            fn  --  callable to run off the GUI thread
+        """
+        super(_ShutdownTask, self).__init__()
+        self.__fn = fn
+
+    def run(self):
+        """ Runnable entry point """
+        self.__fn()
+
+"""
+    Main class of the rotator controller GUI
+"""
+class RotUI(QMainWindow):
+    
+    #========================================================================================
+    # Constructor
+    def __init__(self, qt_app):
+        """
+        Constructor
+        
+        Arguments:
+            qt_app  --  the Qt appplication object
+            
+        """
+        
+        super(RotUI, self).__init__()
+        
+        # Get user settings
+        # There is no dialog to set these values so edit the settings file
+        # which is standard .ini format
+        self.__getSettings()
+        
+        # Get system configuration
+        # This is a pickled file so non-editable
+        config = persist.getSavedCfg(CONFIG_PATH)
+        if config != None:
+            defs.config = config
+        
+        # The application
+        self.__qt_app = qt_app
+        
+        # Set the back colour
+        palette = QtGui.QPalette()
+        palette.setColor(QtGui.QPalette.Background,QtGui.QColor(195,195,195,255))
+        self.setPalette(palette)
+
+        # Pre-built palettes for the status indicators. Swapping a
+        # palette repaints without the CSS parse of setStyleSheet.
+        self.__palRed = QtGui.QPalette()
+        self.__palRed.setColor(QtGui.QPalette.Window, QtGui.QColor('red'))
+        self.__palGreen = QtGui.QPalette()
+        self.__palGreen.setColor(QtGui.QPalette.Window, QtGui.QColor('green'))
+        self.__palAmber = QtGui.QPalette()
+        self.__palAmber.setColor(QtGui.QPalette.Window, QtGui.QColor(199,94,44))
+
+        # Create graphics instances
+        self.__azpos = graphics.AzPos()
+        self.__elpos = graphics.ElPos()
+        
+        # Initialise the GUI
+        self.initUI()
+        
+        # Thread safe queues
+        self.__msgq = queue.Queue()
+        # Commands are waited on by the rotator interface so use a blocking queue
+        self.__cmdq = queue.Queue()
+        # CAT responses are waited on so use a blocking queue
+        self.__catq = queue.Queue()
+        
+        # Calibration prompt, created on first use and reused
+        self.__calMsgBox = None
+        # Satellite rotator interface set when invoked
+        self.__satif = None
+        # Satellite rig interface set when invoked
+        self.__rigif = None
+        # CAT not running
+        self.__cat = None
+        self.__catState = OFFLINE
+        
+        # Tracking
+        self.__satTrackState = OFFLINE
+        self.__rigTrackState = OFFLINE
+        self.__rigTrackFreq = ()
+        self.__lastSatTrackState = OFFLINE
+        # Last frequencies written to the RX/TX fields
+        self.__lastRx = None
+        self.__lastTx = None
+        
+        # Startup state
+        self.__state = OFFLINE
+        self.__lastState = OFFLINE
+        self.__ping_timer = 0
+        self.__waitingMsg = False
+        
+        # Inhibit UI events
+        self.__inhibit = False
+
+        # Last applied interactor context, None forces the first apply
+        self.__lastCtxKey = None
+
+        # Consecutive idle ticks with no traffic, drives the tick backoff
+        self.__idleEmptyCount = 0
+    
+    #========================================================================================
+    # Get and update configuration
+    def __getSettings(self):
+        config = configparser.ConfigParser()
+        try:
+            config.read(SETTINGS_PATH)
+            # Use the section proxies throughout, each getint(section, key)
+            # re-resolves the section by name
+            if 'ARDUINO' in config:
+                arduino = config['ARDUINO']
+                defs.HW_RQST_IP = arduino['RQST_IP']
+                defs.HW_RQST_PORT = int(arduino['RQST_PORT'])
+                if len(arduino['LOCAL_IP']) == 0 and platform.system().lower() == 'linux':
+                    defs.HW_LOCAL_IP = self.__get_ip()
+                else:
+                    defs.HW_LOCAL_IP = arduino['LOCAL_IP']
+                defs.HW_EVNT_PORT = int(arduino['EVNT_PORT'])
+                defs.HW_TIMEOUT = int(arduino['HW_TIMEOUT'])
+                defs.SAT_TIMEOUT = int(arduino['SAT_TIMEOUT'])
+                defs.CAL_TIMEOUT = int(arduino['CAL_TIMEOUT'])
+                defs.MOV_TIMEOUT = int(arduino['MOV_TIMEOUT'])
+                defs.AZ_MOTOR_SPEED = int(arduino['AZ_MOTOR_SPEED'])
+                defs.EL_MOTOR_SPEED = int(arduino['EL_MOTOR_SPEED'])
+            else:
+                print('No ARDUINO section in settings, using defaults!')
+            if 'GPREDICT' in config:
+                gpredict = config['GPREDICT']
+                defs.SAT_IP = gpredict['BIND_IP']
+                defs.SAT_PORT = int(gpredict['SAT_PORT'])
+                defs.RIG_IP = gpredict['BIND_IP']
+                defs.RIG_PORT = int(gpredict['RIG_PORT'])
+            else:
+                print('No GPREDICT section in settings, using defaults!')
+            if 'CAT' in config:
+                cat = config['CAT']
+                defs.CAT_RIG = cat['RIG']
+                defs.CAT_PORT = cat['PORT']
+                defs.CAT_BAUD = int(cat['BAUD'])
+            else:
+                print('No CAT section in settings, using defaults!')
+        except Exception as e:
+            print("Settings exception! [%s]" % str(e))
+    
+    # Return
+    def __get_ip(self):
+        """ Return our ip address """
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            # doesn't even have to be reachable
+            s.connect(('10.255.255.255', 1))
+            IP = s.getsockname()[0]
+        except Exception:
+            IP = '127.0.0.1'
+        finally:
+            s.close()
+        return IP
+
+    #========================================================================================
+    # Run application here
+    def run(self, ):
+        """ Run the application """
+        
+        # Create and start the rotator interfaces
+        self.__rotif = rotif.RotIf(self.__rotState, self.__rotEvents, self.__cmdq, self.__msgq)
+        self.__rotif.start()
+        
+        # Start idle processing
+        # One persistent timer for the periodic housekeeping. Position
+        # updates arrive as posted events so need no polling.
+        self.__idleTimer = QtCore.QTimer(self)
+        self.__idleTimer.timeout.connect(self.__idleProcessing)
+        self.__idleTimer.start(IDLE_TICKER)
+        
+        # Returns when application exits
+        # Show the GUI
+        self.show()
+        self.logOutput.appendPlainText('Attempting to connect to controller...')
+        
+        return self.__qt_app.exec_()
+    
+    #========================================================================================    
+    # UI initialisation and window event handlers
+    def initUI(self):
+        """ Configure the GUI interface """
+        
+        self.setToolTip('Rotator Control')
+
+        # One consolidated stylesheet parsed once at the top level. The
+        # per-widget setStyleSheet calls this replaces each cost a CSS
+        # parse and a repolish of the widget during startup.
+        # The status indicators are excluded, they are driven by palette
+        # swaps which a stylesheet background would override
+        self.setStyleSheet(
+            "QLabel#valRed {color: red; font: 14px;}"
+            " QLabel#valGreen {color: green; font: 14px;}"
+            " QLineEdit#rigFreq {background-color: rgb(151,168,168); font: 20px;}"
+            " QComboBox#rigMode {background-color: rgb(151,168,168); font: 14px;}"
+            " QGroupBox#controlPanel QLabel {color: rgb(172,63,26);}")
+
+        # Arrange window
+        # Bind the sub-dict once, it is also mutated from the geometry
+        # handlers which fire on every pixel of a drag
+        self.__winCfg = defs.config["Window"]
+        window = self.__winCfg
+        self.setGeometry(window["X"],
+                         window["Y"],
+                         window["W"],
+                         window["H"])
+
+        # Coalesce the geometry writes so only the final size/position
+        # of a drag is recorded
+        self.__geomTimer = QtCore.QTimer(self)
+        self.__geomTimer.setSingleShot(True)
+        self.__geomTimer.timeout.connect(self.__flushGeom)
+        self.__newSize = None
+        self.__newPos = None
+                         
+        self.setWindowTitle('MiniSat Control')
+        
+        # Configure Menu
+        aboutAction = QAction(_icon('about.png'), '&About', self)
+        aboutAction.setShortcut('Ctrl+A')
+        aboutAction.setStatusTip('About')
+        aboutAction.triggered.connect(self.about)
+        exitAction = QAction(_icon('exit.png'), '&Exit', self)
+        exitAction.setShortcut('Ctrl+Q')
+        exitAction.setStatusTip('Quit application')
+        exitAction.triggered.connect(self.quit)
+        
+        menubar = self.menuBar()
+        fileMenu = menubar.addMenu('&File')
+        fileMenu.addAction(exitAction)
+        helpMenu = menubar.addMenu('&Help')
+        helpMenu.addAction(aboutAction)
+        
+        self.__makeWidgets()
+    
+    #=======================================================
+    # Construct and layout all widgets
+    #=======================================================
+    def __makeWidgets(self):
+        
+        #=======================================================
+        # Set main layout
+        w = QWidget()
+        self.setCentralWidget(w)
+        self.__grid = QGridLayout()
+        w.setLayout(self.__grid)
+        
+        #=======================================================
+        # Populate main grid
+        self.__popMain(self.__grid)
+        
+        #=======================================================
+        # Create a status grid bottom left of main grid
+        self.__statusGrid = QGridLayout()
+        box1 = QGroupBox('Status')
+        box1.setLayout(self.__statusGrid)
+        # Add panel to status grid
+        self.__grid.addWidget(box1, 4, 2, 1, 1)
+        
+        #=======================================================
+        # Populate status grid
+        self.__popStatus(self.__statusGrid)
+        
+        #=======================================================
+        # Create an interactor grid left side of main grid
+        self.__interactorGrid = QGridLayout()
+        box2 = QGroupBox('Control Panel')
+        box2.setLayout(self.__interactorGrid)
+        # Add panel to main grid
+        self.__grid.addWidget(box2, 0, 0, 4, 1)
+        # The label colour for the control panel is set by the
+        # consolidated stylesheet
+        box2.setObjectName("controlPanel")
+        
+        #=======================================================
+        # Within the interactor grid add another grid to hold
+        # the rotator control interactors
+        self.__rotGrid = QGridLayout()
+        box3 = QGroupBox('Rotator Control')
+        box3.setLayout(self.__rotGrid)
+        # Add rot grid to top grid
+        self.__interactorGrid.addWidget(box3, 0, 0)
+        
+        #=======================================================
+        # Within the rotator grid add a second grid to hold
+        # the nudge controls
+        self.__nudgeGrid = QGridLayout()
+        box4 = QFrame()
+        box4.setLayout(self.__nudgeGrid)
+        # Add nudge grid to rotator grid
+        # Occupies row 1 and 5 cols
+        self.__rotGrid.addWidget(box4, 1, 0, 1, 5)
+        
+        # Add another grid tgo hold the tracking controls
+        # the tracking widgets so they can be spaces properly
+        self.__trackGrid = QGridLayout()
+        box5 = QFrame()
+        box5.setLayout(self.__trackGrid)
+        # Add track grid to rotator grid
+        # Occupies row 2 and 5 cols
+        self.__rotGrid.addWidget(box5, 2, 0, 1, 5)
+        
+        #=======================================================
+        # Populate the rotator grid
+        self.__popRotator(self.__rotGrid, self.__nudgeGrid, self.__trackGrid)
+        
+        #=======================================================
+        # Within the interactor grid add a second grid to hold
+        # the rig control interactors
+        self.__rigGrid = QGridLayout()
+        box5 = QGroupBox('Rig Control')
+        box5.setLayout(self.__rigGrid)
+        # Add rig grid to side grid
+        # Occupies row 3 and 2 cols
+        self.__interactorGrid.addWidget(box5, 1, 0)
+        
+        #=======================================================
+        # Within the rig grid add a second grid to hold
+        # the check boxes so they can be spaces properly
+        self.__catGrid = QGridLayout()
+        box6 = QFrame()
+        box6.setLayout(self.__catGrid)
+        # Add rig grid to side grid
+        # Occupies row 3 and 2 cols
+        self.__rigGrid.addWidget(box6, 0, 0, 1, 6)
+        
+        #=======================================================
+        # Populate the rig grid
+        self.__popRig(self.__rigGrid, self.__catGrid)
+        
+        #=======================================================
+        # Add quit button to the interactor grid
+        self.quitbtn = QPushButton('Exit')
+        self.__interactorGrid.addWidget(self.quitbtn, 5, 0)
+        self.quitbtn.clicked.connect(self.__onQuit)
+    
+    #=======================================================
+    # Populate main grid
+    #=======================================================
+    def __popMain(self, grid):
+    
+        # Graphics
+        grid.addWidget(self.__azpos, 0, 1, 2, 2)
+        grid.addWidget(self.__elpos, 2, 1, 2, 2)
+        
+        # Messages
+        # A plain text document lays out much faster than rich text and
+        # the block limit bounds memory and paint cost over a long session
+        self.logOutput = QPlainTextEdit()
+        self.logOutput.setReadOnly(True)
+        self.logOutput.setUndoRedoEnabled(False)
+        self.logOutput.setMaximumBlockCount(200)
+        self.logOutput.setLineWrapMode(QPlainTextEdit.NoWrap)
+        # Build the log font in one go - the old fetch-and-mutate of the
+        # widget font was never applied back
+        self.logOutput.setFont(QFont("Courier", 10))
+        grid.addWidget(self.logOutput, 4, 0, 1, 3)
+        self.logOutput.setFixedHeight(110)
+        self.logOutput.setFixedWidth(400)
+    
+    #=======================================================
+    # Populate status grid
+    #=======================================================
+    def __popStatus(self, grid):
+        contlabel = QLabel('Controller')
+        grid.addWidget(contlabel, 0, 0)
+        self.contInd = QFrame()
+        self.contInd.setAutoFillBackground(True)
+        self.contInd.setPalette(self.__palRed)
+        self.contInd.setFixedHeight(10)
+        self.contInd.setFixedWidth(10)
+        grid.addWidget(self.contInd, 0, 1)
+        
+        callabel = QLabel('Calibration')
+        grid.addWidget(callabel, 1, 0)
+        self.calInd = QFrame()
+        self.calInd.setAutoFillBackground(True)
+        self.calInd.setPalette(self.__palRed)
+        self.calInd.setFixedHeight(10)
+        self.calInd.setFixedWidth(10)
+        grid.addWidget(self.calInd, 1, 1)
+        
+        satlabel = QLabel('Sat Track')
+        grid.addWidget(satlabel, 2, 0)
+        self.satInd = QFrame()
+        self.satInd.setAutoFillBackground(True)
+        self.satInd.setPalette(self.__palRed)
+        self.satInd.setFixedHeight(10)
+        self.satInd.setFixedWidth(10)
+        grid.addWidget(self.satInd, 2, 1)
+        
+        riglabel = QLabel('Rig Track')
+        grid.addWidget(riglabel, 3, 0)
+        self.rigInd = QFrame()
+        self.rigInd.setAutoFillBackground(True)
+        self.rigInd.setPalette(self.__palRed)
+        self.rigInd.setFixedHeight(10)
+        self.rigInd.setFixedWidth(10)
+        grid.addWidget(self.rigInd, 3, 1)
+        
+        catlabel = QLabel('CAT')
+        grid.addWidget(catlabel, 4, 0)
+        self.catInd = QFrame()
+        self.catInd.setAutoFillBackground(True)
+        self.catInd.setPalette(self.__palRed)
+        self.catInd.setFixedHeight(10)
+        self.catInd.setFixedWidth(10)
+        
+        grid.addWidget(self.catInd, 4, 1)
+        
+    #=======================================================
+    # Populate Rotator grid
+    #=======================================================
+    def __popRotator(self, rotgrid, nudgegrid, trackgrid):
+        # Calibration
+        self.calibratebtn = QPushButton('(re)Calibrate')
+        rotgrid.addWidget(self.calibratebtn, 0, 0, 1, 2)
+        self.calibratebtn.clicked.connect(self.__onCalibrate)
+        
+        # Home
+        self.homebtn = QPushButton('Home')
+        rotgrid.addWidget(self.homebtn, 0, 3, 1, 2)
+        self.homebtn.clicked.connect(self.__onHome)
+        
+        # Nudge
+        nudgefwdlabel = QLabel('Fwd')
+        nudgegrid.addWidget(nudgefwdlabel, 0, 0)
+        self.nudgefwdrb = QRadioButton('')
+        nudgegrid.addWidget(self.nudgefwdrb, 0, 1)
+        self.nudgefwdrb.setChecked(True)
+        nudgerevlabel = QLabel('Rev')
+        nudgegrid.addWidget(nudgerevlabel, 0, 2)
+        self.nudgerevrb = QRadioButton('')
+        nudgegrid.addWidget(self.nudgerevrb, 0, 3)
+        
+        self.nudgeazbtn = QPushButton('Nudge Az')
+        nudgegrid.addWidget(self.nudgeazbtn, 0, 4)
+        self.nudgeazbtn.clicked.connect(self.__onNudgeAz)
+        #self.nudgeazbtn.setStyleSheet("color: red; font: 14px")
+        self.nudgeelbtn = QPushButton('Nudge El')
+        nudgegrid.addWidget(self.nudgeelbtn, 0, 5)
+        self.nudgeelbtn.clicked.connect(self.__onNudgeEl)
+        
+        # Tracking
+        trackinglabel = QLabel('Track Satelite')
+        trackgrid.addWidget(trackinglabel, 0, 0)
+        self.rottrackcb = QCheckBox('')
+        self.rottrackcb.stateChanged.connect(self.__trackChanged)
+        trackgrid.addWidget(self.rottrackcb, 0, 1)
+        # Actual values to move to
+        self.trackazlabel = QLabel('Az:')
+        trackgrid.addWidget(self.trackazlabel, 0, 2)
+        self.trackazvalue = QLabel('---')
+        self.trackazvalue.setObjectName("valGreen")
+        trackgrid.addWidget(self.trackazvalue, 0, 3)
+        self.trackellabel = QLabel('El:')
+        trackgrid.addWidget(self.trackellabel, 0, 4)
+        self.trackelvalue = QLabel('---')
+        self.trackelvalue.setObjectName("valGreen")
+        trackgrid.addWidget(self.trackelvalue, 0, 5)
+        
+        # Azimuth
+        azimuthlabel = QLabel('Azimuth')
+        rotgrid.addWidget(azimuthlabel, 3, 0)
+        self.azimuthtxt = QSpinBox()
+        self.azimuthtxt.setRange(0, 359)
+        self.azimuthtxt.setToolTip('0-360 Deg')
+        self.azimuthtxt.setMaximumWidth(100)
+        rotgrid.addWidget(self.azimuthtxt, 3, 1)
+        self.azimuthbtn = QPushButton('Move')
+        self.azimuthbtn.setMaximumWidth(50)
+        rotgrid.addWidget(self.azimuthbtn, 3, 2)
+        self.azimuthbtn.clicked.connect(self.__onAzimuth)
+        azimuthlabel = QLabel('Current')
+        rotgrid.addWidget(azimuthlabel, 3, 3)
+        self.azimuthvallabel = QLabel('---')
+        self.azimuthvallabel.setObjectName("valRed")
+        rotgrid.addWidget(self.azimuthvallabel, 3, 4)
+        
+        # Elevation
+        elevationlabel = QLabel('Elevation')
+        rotgrid.addWidget(elevationlabel, 4, 0)
+        self.elevationtxt = QSpinBox()
+        self.elevationtxt.setRange(0, 90)
+        self.elevationtxt.setToolTip('0-90 Deg')
+        self.elevationtxt.setMaximumWidth(100)
+        rotgrid.addWidget(self.elevationtxt, 4, 1)
+        self.elevationbtn = QPushButton('Move')
+        self.elevationbtn.setMaximumWidth(50)
+        rotgrid.addWidget(self.elevationbtn, 4, 2)
+        self.elevationbtn.clicked.connect(self.__onElevation)
+        elevationlabel = QLabel('Current')
+        rotgrid.addWidget(elevationlabel, 4, 3)
+        self.elevationvallabel = QLabel('--')
+        self.elevationvallabel.setObjectName("valRed")
+        rotgrid.addWidget(self.elevationvallabel, 4, 4)
+    
+    #=======================================================
+    # Populate rig grid
+    #=======================================================
+    def __popRig(self, rigGrid, catGrid):
+
+        # CAT and track section
+        catlabel = QLabel('CAT Enable')
+        catGrid.addWidget(catlabel, 0, 0)
+        self.catcb = QCheckBox('')
+        self.catcb.stateChanged.connect(self.__catChanged)
+        catGrid.addWidget(self.catcb, 0, 1)
+
+        tracklabel = QLabel('Track Freq')
+        catGrid.addWidget(tracklabel, 0, 2)
+        self.rigtrackcb = QCheckBox('')
+        self.rigtrackcb.stateChanged.connect(self.__rigTrackChanged)
+        self.__catGrid.addWidget(self.rigtrackcb, 0, 3)
+        
+        # Allow manual PTT
+        pttlabel = QLabel('PTT')
+        catGrid.addWidget(pttlabel, 0, 4)
+        self.pttcb = QCheckBox('')
+        self.pttcb.stateChanged.connect(self.__pttChanged)
+        self.__catGrid.addWidget(self.pttcb, 0, 5)
+        
+        # Indicator for rig in TX
+        self.txInd = QFrame()
+        self.txInd.setAutoFillBackground(True)
+        self.txInd.setPalette(self.__palGreen)
+        self.txInd.setFixedHeight(10)
+        self.txInd.setFixedWidth(10)
+        catGrid.addWidget(self.txInd, 0, 6)
+        
+        # Frequency and mode section
+        # RX freq
+        rigrxlabel = QLabel('RX')
+        rigGrid.addWidget(rigrxlabel, 1, 0)
+        self.__rigrx = QLineEdit('000.000.000')
+        self.__rigrx.setInputMask('999.999.999')
+        self.__rigrx.setObjectName("rigFreq")
+        rigGrid.addWidget(self.__rigrx, 1, 1, 1, 2)
+        self.__rigrx.setMaximumWidth(120)
+        
+        self.setrxfbtn = QPushButton('Set')
+        rigGrid.addWidget(self.setrxfbtn, 1, 4)
+        self.setrxfbtn.clicked.connect(self.__onSetRxFreq)
+        self.setrxfbtn.setMaximumWidth(50)
+        
+        # TX freq
+        rigtxlabel = QLabel('TX')
+        rigGrid.addWidget(rigtxlabel, 2, 0)
+        self.__rigtx = QLineEdit('000.000.000')
+        self.__rigtx.setInputMask('999.999.999')
+        self.__rigtx.setObjectName("rigFreq")
+        rigGrid.addWidget(self.__rigtx, 2, 1, 1, 2)
+        self.__rigtx.setMaximumWidth(120)
+        
+        self.settxfbtn = QPushButton('Set')
+        rigGrid.addWidget(self.settxfbtn, 2, 4)
+        self.settxfbtn.clicked.connect(self.__onSetTxFreq)
+        self.settxfbtn.setMaximumWidth(50)
+        
+        # Mode
+        rigmodelabel = QLabel('Mode')
+        rigGrid.addWidget(rigmodelabel, 3, 0)
+        self.__rigmodesel = QComboBox()
+        self.__rigmodesel.addItems(['LSB','USB','FM'])
+        self.__rigmodesel.setObjectName("rigMode")
+        rigGrid.addWidget(self.__rigmodesel, 3, 1, 1, 2)
+        self.__rigmodesel.setMaximumWidth(120)
+        
+        self.setmodebtn = QPushButton('Set')
+        rigGrid.addWidget(self.setmodebtn, 3, 4)
+        self.setmodebtn.clicked.connect(self.__onSetMode)
+        self.setmodebtn.setMaximumWidth(50)
+        
+    #========================================================================================
+    # UI Event Handling
+    def about(self):
+        """ User hit about """
+        
+        text = """
+Azimuth and Elevation Controller
+
+    by Bob Cowdery (G3UKB)
+    email:  bob@bobcowdery.plus.com
+"""
+        QMessageBox.about(self, 'About', text)
+    
+    # Window events
+    def close(self):
+                        
+        # Close
+        if self.__cat != None:
+            self.__cat.terminate()
+
+        if self.__rotif != None:
+            self.__rotif.terminate()
+            self.__rotif.join()
+
+        if self.__satif != None:
+            self.__satif.terminate()
+            self.__satif.join()
+
+        if self.__rigif != None:
+            self.__rigif.terminate()
+            self.__rigif.join()
+    
+        # Save configuration, flushing any geometry change still pending
+        self.__flushGeom()
+        persist.saveCfg(CONFIG_PATH, defs.config)
+        
+        # Final check as Python does not terminate unless all tasks are terminated
+        # We do not clean up automatically as this is a bug that needs fixing.
+        tasks = threading.enumerate()
+        if len(tasks) > 1:
+            print("Some tasks have not terminated! ,", tasks)
+         
+    def quit(self):
+        """ User hit quit """
+        
+        # Close
+        self.close()
+        sys.exit()
+        
+    def closeEvent(self, event):
+        """
+        User hit x
+        
+        Arguments:
+            event   -- ui event object
+            
+        """
+        
+        # Be polite, ask user
+        reply = QMessageBox.question(self, 'Quit?',
+            "Quit application?", QMessageBox.Yes | 
+            QMessageBox.No, QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            self.close()
+        else:
+            event.ignore()
+    
+    def __onQuit(self):
+        """ Quit application """
+        self.quit()
+    
+    def resizeEvent(self, event):
+        # Qt emits synthetic resize events on show/hide so skip when
+        # nothing changed
+        new = event.size()
+        if new == event.oldSize():
+            return
+        # Stash the latest size, the config is updated when the timer fires
+        self.__newSize = new
+        self.__geomTimer.start(100)
+
+    def moveEvent(self, event):
+        # Skip synthetic move events where the position is unchanged
+        new = event.pos()
+        if new == event.oldPos():
+            return
+        # Stash the latest position, the config is updated when the timer fires
+        self.__newPos = new
+        self.__geomTimer.start(100)
+
+    def __flushGeom(self):
+        # Record the settled geometry in the config
+        if self.__newSize != None:
+            self.__winCfg["W"] = self.__newSize.width()
+            self.__winCfg["H"] = self.__newSize.height()
+            self.__newSize = None
+        if self.__newPos != None:
+            self.__winCfg["X"] = self.__newPos.x()
+            self.__winCfg["Y"] = self.__newPos.y()
+            self.__newPos = None
+
+    #========================================================================================
+    # Activation events
+    
+    def __onCalibrate(self):
+        """ Run azimuth and elevation calibration """
+        self.__msgq.put('Calibrating motors... please wait!')
+        self.__cmdq.put((CMD_COLDSTART, []))
+    
+    def __onHome(self):
+        """ Go to home """
+        self.__cmdq.put((CMD_HOMEAZ, []))
+        self.__cmdq.put((CMD_HOMEEL, []))
+    
+    def __onNudgeAz(self):
+        """ Move Az forward a tad """
+        if self.nudgefwdrb.isChecked():
+            self.__cmdq.put((CMD_NUDGEAZFWD, []))
+        else:
+            self.__cmdq.put((CMD_NUDGEAZREV, []))
+    
+    def __onNudgeEl(self):
+        """ Move El forward a tad  """
+        if self.nudgefwdrb.isChecked():
+            self.__cmdq.put((CMD_NUDGEELFWD, []))
+        else:
+            self.__cmdq.put((CMD_NUDGEELREV, []))
+
+    def __onAzimuth(self):
+        """ Move to new azimuth """
+        try:
+            if len(self.azimuthtxt.text()) > 0:
+                azimuth = int(self.azimuthtxt.text())
+            # Set the position
+            self.__cmdq.put((CMD_SETPOSAZ, [azimuth]))
+        except ValueError:
+            self.logOutput.appendPlainText('Bad azimuth position [%s]' % (self.azimuthtxt.text()))
+    
+    def __onElevation(self):
+        """ Move to new elevation """
+        try:
+            if len(self.elevationtxt.text()) > 0:
+                elevation = int(self.elevationtxt.text())
+            # Set the position
+            self.__cmdq.put((CMD_SETPOSEL, [elevation]))
+        except ValueError:
+            self.logOutput.appendPlainText('Bad elevation position [%s]' % (self.elevationtxt.text()))
+            
+    def __trackChanged(self):
+        """ Antenna tracking changed """
+        if self.rottrackcb.isChecked():
+            if self.__satif != None:
+                self.__satif.terminate()
+                self.__satif.join()
+                self.__satif = None
+            # Create the sat interface
+            self.__satif = satif.SatIf(self.__satStatus, self.__satPosition, self.__cmdq, self.__msgq)
+            self.__satif.start()
+        else:
+            if self.__satif != None:
+                self.__satif.terminate()
+                self.__satif.join()
+                self.__satif = None
+    
+    def __catChanged(self):
+        # Create and run the CAT instance
+        # The operating is async
+        # 1. Receive command from sat control application or UI
+        # 2. Forward command to serial port (tranceiver)
+        # 3. Receive a CAT response from serial port which arrives at the callback
+        # 4. Send response to the sat control application and/or update UI
+        if self.__inhibit: return
+        if self.catcb.isChecked():
+            if self.__cat == None:
+                # First enable, create the CAT instance
+                self.__cat = cat.CAT(defs.CAT_RIG, defs.CAT_PORT, defs.CAT_BAUD, self.__catq, self.__msgq)
+            # Opens the port on first run, resumes traffic thereafter
+            if self.__cat.run():
+                self.__catState = ONLINE
+            else:
+                # Failed to start CAT
+                self.__cat.terminate()
+                self.__cat = None
+                self.__catState = OFFLINE
+        else:
+            if self.__cat != None:
+                # Pause CAT, the port and thread stay up for the next enable
+                self.__cat.pause()
+                self.__catState = OFFLINE
+        
+    def __rigTrackChanged(self):
+        if self.__inhibit: return
+        if self.__cat == None:
+            # First use, create the CAT instance
+            self.__cat = cat.CAT(defs.CAT_RIG, defs.CAT_PORT, defs.CAT_BAUD, self.__catq, self.__msgq)
+        # Opens the port on first run, resumes traffic thereafter
+        if self.__cat.run():
+            self.__catState = ONLINE
+        else:
+            # Failed to start CAT
+            self.__cat.terminate()
+            self.__cat = None
+            self.__catState = OFFLINE
+            self.rigtrackcb.setChecked(False)
+            return
+        
+        if self.rigtrackcb.isChecked():
+            self.__dropRigIf()
+            # Create the rig interface
+            # The bind retry in the rig interface rides out any overlap
+            # while the old instance is still releasing the port
+            self.__rigif = rigif.RigIf(self.__cat, self.__catq, self.__rigStatus, self.__rigFreq, self.__msgq)
+            self.__rigif.start()
+        else:
+            self.__dropRigIf()
+
+    def __dropRigIf(self):
+        """ Terminate the rig interface without blocking the GUI thread """
+
+        # terminate() joins the listener which can take up to its recv
+        # timeout so run it on the thread pool. The idle tick reaps the
+        # instance via is_alive() once it has died.
+        if self.__rigif != None:
+            QtCore.QThreadPool.globalInstance().start(_ShutdownTask(self.__rigif.terminate))
+
+
+    @staticmethod
+    def _parseFreq(s):
+        # The input mask fixes the field at 999.999.999 so the digit
+        # groups can be sliced directly without a split allocation
+        return int(s[0:3])*1000000 + int(s[4:7])*1000 + int(s[8:11])
+
+    def __onSetRxFreq(self):
+        # Manually set the RX frequency
+        if self.__cat != None:
+            f = self._parseFreq(self.__rigrx.text())
+            self.__cat.do_command(CAT_FREQ_SET, str(f))
+
+    def __onSetTxFreq(self):
+        # Manually set the TX frequency
+        if self.__cat != None:
+            f = self._parseFreq(self.__rigtx.text())
+            self.__cat.do_command(CAT_FREQ_SET, str(f))
+    
+    def __onSetMode(self):
+        # Manually set mode
+        self.__cat.do_command(CAT_MODE_SET, self.__rigmodesel.currentText())
+    
+    def __pttChanged(self):
+        # Manually set PTT
+        # This has to be handled by the rig interface
+        if self.pttcb.isChecked():
+            self.__rigif.manualSetPtt(True)
+        else:
+            self.__rigif.manualSetPtt(False)
+    
+    #========================================================================================
+    # Callbacks
+    def __rotState(self, state):
+        """
+        Receives state updates
+        
+        """
+        self.__state = state
+        
+    def __rotEvents(self, what, value):
+        """
+        Receives position events on the rotif thread
+
+        Arguments:
+            what    --  az|el
+            value   --  degrees
+        """
+
+        QtCore.QCoreApplication.postEvent(self, _UpdateEvent(what, value))
+        
+    def __satStatus(self, state):
+        """
+        Receives sat connect state updates
+        
+        """
+        self.__satTrackState = state
+    
+    def __satPosition(self, azimuth, elevation):
+        """
+        Receives sat position for display on the satif thread
+
+        """
+
+        QtCore.QCoreApplication.postEvent(self, _UpdateEvent('sat', (azimuth, elevation)))
+        
+    def __rigStatus(self, state):
+        """
+        Receives rig connect state updates
+        
+        """
+        self.__rigTrackState = state
+    
+    def __rigFreq(self, mode, freq):
+        """
+        Receives rig frequency updates
+        
+            mode    --  RX/TX
+            freq    --  current tracking frequency
+        
+        """
+        self.__rigTrackFreq = (mode, freq)
+
+    def customEvent(self, ev):
+        """
+        Receives update events posted from the worker threads.
+        Delivered on the GUI thread so widgets are safe to touch.
+
+        Arguments:
+            ev  --  _UpdateEvent instance
+        """
+
+        if ev.type() != _UPDATE_EVENT:
+            return
+        try:
+            if ev.what == 'sat':
+                azimuth, elevation = ev.value
+                self.trackazvalue.setText(str(azimuth))
+                self.trackelvalue.setText(str(elevation))
+            elif self.__state == ONLINE:
+                if ev.what == 'az':
+                    self.azimuthvallabel.setText(str(ev.value))
+                    self.__azpos.setHeading(ev.value)
+                elif ev.what == 'el':
+                    self.elevationvallabel.setText(str(ev.value))
+                    self.__elpos.setElevation(ev.value)
+        except Exception:
+            self.__msgq.put("Error updating position!")
+
+    #========================================================================================
+    # Idle time processing 
+    def __idleProcessing(self):
+        
+        """
+        Idle processing.
+        Called on every tick of the housekeeping timer
+        
+        """
+        # Empty the message q, batching the lines into a single append
+        # so the log document is laid out and repainted once per tick
+        batch = []
+        while not self.__msgq.empty():
+            t = self.__msgq.get_nowait()
+            if "error" in t.lower():
+                if self.__state == ONLINE:
+                    # Output error messages only if online
+                    batch.append('<span style="color:red">%s</span>' % t)
+                else:
+                    # Offline
+                    if not self.__waitingMsg:
+                        batch.append('<span style="color:green">Waiting for controller to come on-line...</span>')
+                        self.__waitingMsg = True
+
+            else:
+                if "info" in t.lower():
+                    batch.append('<span style="color:green">%s</span>' % t)
+                else:
+                    batch.append('<span style="color:black">%s</span>' % t)
+        if len(batch) > 0:
+            self.logOutput.appendHtml('<br>'.join(batch))
+
+        # Position display shows placeholders until the controller is online
+        if self.__state != ONLINE:
+            self.azimuthvallabel.setText('---')
+            self.elevationvallabel.setText('--')
+
+        # Adjust interface
+        self.__setContext()
+        
+        # Check and action according to startup state
+        self.__checkState()
+        
+        # Check SAT tracking state
+        self.__checkSatTrack()
+        
+        # Check CAT and Rig Track state
+        self.__checkCATTrackState()
+        
+        # Update TX indicator
+        self.__updateTXInd()
+
+        # Adapt the tick - react quickly while messages are flowing,
+        # back off to the normal rate after a few quiet ticks
+        if len(batch) > 0:
+            self.__idleEmptyCount = 0
+        else:
+            self.__idleEmptyCount += 1
+        interval = min(IDLE_TICKER, 50 * (1 + self.__idleEmptyCount // 4))
+        if interval != self.__idleTimer.interval():
+            self.__idleTimer.setInterval(interval)
+
+    # Context processing
+    def __setContext(self):
+
+        """
+        Called every 100ms from idle processing.
+        Adjust all interactore to reflect current context.
+
+        """
+        # The enabled state of every interactor is a pure function of
+        # this key. Skip the ~15 setEnabled round trips into Qt when
+        # nothing has changed, which is almost every tick.
+        key = (self.__state,
+               self.rottrackcb.isChecked(),
+               self.rigtrackcb.isChecked(),
+               self.catcb.isChecked())
+        if key == self.__lastCtxKey:
+            return
+        self.__lastCtxKey = key
+
+        # Exit is always enabled.
+        self.quitbtn.setEnabled(True)
+        #
+        # If the controller is on-line then -
+        #   All Rotator Control is enabled.
+        #   All Rig Control is enabled.
+        if self.__state == ONLINE:
+            self.__rotatorContext(ENABLE)
+            self.__rigContext(ENABLE)
+        #
+        # If we are in manual allow manual controls    
+        elif self.__state == CAL_MANUAL:
+            self.calibratebtn.setEnabled(True)
+            self.homebtn.setEnabled(False)
+            self.nudgefwdrb.setEnabled(True)
+            self.nudgerevrb.setEnabled(True)
+            self.nudgeazbtn.setEnabled(True)
+            self.nudgeelbtn.setEnabled(True)
+        #
+        # If the controller is off-line then -
+        #   All Rotator Control is disabled except track so we can test tracking.
+        #   All Rig control is enabled, even tracking,
+        #   although the antenna obviously won't follow.
+        else:
+            self.__rotatorContext(DISABLE)
+            self.rottrackcb.setEnabled(True)
+            self.__rigContext(ENABLE)
+        #
+        # Sub context -
+        #   If Rotator Control Track is set then -
+        #       Manual control is inhibited
+        if self.rottrackcb.isChecked():
+            self.calibratebtn.setEnabled(False)
+            self.homebtn.setEnabled(False)
+            self.nudgefwdrb.setEnabled(False)
+            self.nudgerevrb.setEnabled(False)
+            self.nudgeazbtn.setEnabled(False)
+            self.nudgeelbtn.setEnabled(False)
+            self.azimuthtxt.setEnabled(False)
+            self.azimuthbtn.setEnabled(False)
+            self.elevationtxt.setEnabled(False)
+            self.elevationbtn.setEnabled(False)
+        # Sub context -
+        #   If Rig Control Track is set and CAT is not set then -
+        #       CAT will be automatically set and then disabled.
+        #   If Rig Control track is unset then CAT will be left
+        #   in its previous state after its enabled.
+        if self.rigtrackcb.isChecked():
+            self.pttcb.setEnabled(True)
+            self.catcb.setEnabled(False)
+            self.__rigrx.setEnabled(False)
+            self.setrxfbtn.setEnabled(False)
+            self.__rigtx.setEnabled(False)
+            self.settxfbtn.setEnabled(False)
+            self.__rigmodesel.setEnabled(True)
+            self.setmodebtn.setEnabled(True)
+        elif self.catcb.isChecked():
+            self.pttcb.setEnabled(False)
+            self.catcb.setEnabled(True)
+            self.__rigrx.setEnabled(True)
+            self.setrxfbtn.setEnabled(True)
+            self.__rigtx.setEnabled(True)
+            self.settxfbtn.setEnabled(True)
+            self.__rigmodesel.setEnabled(True)
+            self.setmodebtn.setEnabled(True)
+        else:
+            self.pttcb.setEnabled(False)
+            self.__rigrx.setEnabled(False)
+            self.setrxfbtn.setEnabled(False)
+            self.__rigtx.setEnabled(False)
+            self.settxfbtn.setEnabled(False)
+            self.__rigmodesel.setEnabled(False)
+            self.setmodebtn.setEnabled(False)
+                       
+    # Rotator Context
+    def __rotatorContext(self, state):
+        if state == DISABLE:
+            state = False
+        else:
+            state = True
+         
+        self.calibratebtn.setEnabled(state)
+        self.homebtn.setEnabled(state)
+        self.nudgefwdrb.setEnabled(state)
+        self.nudgerevrb.setEnabled(state)
+        self.nudgeazbtn.setEnabled(state)
+        self.nudgeelbtn.setEnabled(state)
+        self.azimuthtxt.setEnabled(state)
+        self.azimuthbtn.setEnabled(state)
+        self.elevationtxt.setEnabled(state)
+        self.elevationbtn.setEnabled(state)
+
+    # Rig Context
+    def __rigContext(self, state):
+        if state == DISABLE:
+            state = False
+        else:
+            state = True    
+        self.catcb.setEnabled(state)
+        self.rigtrackcb.setEnabled(state)
+        self.pttcb.setEnabled(state)
+        self.__rigrx.setEnabled(state)
+        self.setrxfbtn.setEnabled(state)
+        self.__rigtx.setEnabled(state)
+        self.settxfbtn.setEnabled(state)
+        self.__rigmodesel.setEnabled(state)
+        self.setmodebtn.setEnabled(state)
+
+    # Indicator colour
+    def __setInd(self, ind, pal):
+        """
+        Colour a status indicator by swapping in a pre-built palette,
+        avoiding the stylesheet parse and repolish of setStyleSheet
+
+        Arguments:
+            ind     --  indicator QFrame
+            pal     --  one of the pre-built palettes
+        """
+        # The state checks run every tick, skip the repaint when the
+        # indicator already shows this colour
+        if getattr(ind, 'curPal', None) is pal:
+            return
+        ind.curPal = pal
+        ind.setPalette(pal)
+
+    # Action according to startup state
+    def __checkState(self):
+        # State check
+        # The ping timer counts down in ms so the cadence is unaffected
+        # by the adaptive idle tick
+        if self.__ping_timer <= 0:
+            # Time for a state check
+            if self.__state == OFFLINE:
+                # Queue a poll to see if we are connected
+                self.__cmdq.put((CMD_POLL, []))
+                self.__setInd(self.contInd, self.__palRed)
+                self.__setInd(self.calInd, self.__palRed)
+                if self.__lastState != OFFLINE:
+                    self.__msgq.put('Controller has gone offline!')
+            elif self.__state == PENDING:
+                if self.__lastState != PENDING:
+                    # Poll success so try a coldstart if we have calibration data
+                    if ("AZ" in defs.config["Calibration"]) and ("EL" in defs.config["Calibration"]):
+                        self.__cmdq.put((CMD_COLDSTART, []))
+                        self.__msgq.put('Controller is online pending a coldstart')
+                        self.__setInd(self.contInd, self.__palAmber)
+                    else:
+                        # The prompt is purely informational so show it
+                        # non-modally, exec_() would stall the idle timer.
+                        # Built once and reused on later cold starts.
+                        if self.__calMsgBox == None:
+                            msg = QMessageBox(self)
+                            msg.setWindowTitle("Action")
+                            msg.setIcon(QMessageBox.Information)
+                            msg.setText("Calibration required!")
+                            msg.setInformativeText("The controller cannot fully start without calibration data.")
+                            msg.setDetailedText(
+"""
+Please click the calibration button to perform a full calibration.
+For initial testing use the nudge buttons to verify operation of the motors in the correct direction and the corresponding limit switches. Manually operate the forward and reverse limit switches to prevent movement.
+"""
+                            )
+                            msg.setStandardButtons(QMessageBox.Ok)
+                            self.__calMsgBox = msg
+                        self.__calMsgBox.open()
+                        self.__setInd(self.contInd, self.__palAmber)
+                        self.__state = CAL_MANUAL
+                        self.__msgq.put('Waiting for manual calibration...')
+            elif self.__state == STARTING_CAL:
+                self.__msgq.put('Starting calibration...')
+                self.__setInd(self.calInd, self.__palAmber)
+            elif self.__state == ONLINE:
+                if self.__lastState != ONLINE:
+                    self.__msgq.put('Calibration successful, controller online')
+                    self.__setInd(self.contInd, self.__palGreen)
+                    self.__setInd(self.calInd, self.__palGreen)
+                    if  not self.__rotif.isPos():
+                       self.__msgq.put('Info - position is unknown use Home or a Move command')
+                # Check if still on line
+                self.__cmdq.put((CMD_ISONLINE, []))
+            elif self.__state == CAL_FAILED:
+                self.__msgq.put('Calibration failed, continuing to try every 5s.')
+                self.__state = OFFLINE
+                self.__setInd(self.contInd, self.__palAmber)
+                self.__setInd(self.calInd, self.__palRed)
+            elif self.__state == CAL_MANUAL:
+                # Wait state for manual calibration  
+                pass 
+            else:
+                self.__msgq.put('Invalid state %d!' % self.__state)
+            if self.__state == OFFLINE or self.__state == PENDING:
+                self.__ping_timer = PING_TICKER_1 * IDLE_TICKER
+            else:
+                self.__ping_timer = PING_TICKER_2 * IDLE_TICKER
+            self.__lastState = self.__state
+        else:
+            self.__ping_timer -= self.__idleTimer.interval()
+    
+    # Action Sat tracking connection state
+    def __checkSatTrack(self):
+        if self.__satTrackState == OFFLINE:
+            self.__setInd(self.satInd, self.__palRed)
+            if self.__lastSatTrackState == ONLINE:
+                # Just gone offline so uncheck
+                self.rottrackcb.setChecked(False)
+                self.trackazvalue.setText('---')
+                self.trackelvalue.setText('--')
+        elif self.__satTrackState == FAILED:
+            self.__setInd(self.satInd, self.__palRed)
+        elif self.__satTrackState == WAITING:
+            self.__setInd(self.satInd, self.__palAmber)
+        elif self.__satTrackState == ONLINE:
+            self.__setInd(self.satInd, self.__palGreen)
+        # Remember last state
+        self.__lastSatTrackState = self.__satTrackState
+        
+    # Action CAT and rig tracking connection state
+    def __checkCATTrackState(self):
+        # Check CAT
+        # Inhibit only while we programmatically change the checkboxes,
+        # it must never stay latched across ticks or user clicks on the
+        # CAT and Track Freq checkboxes would be silently swallowed
+        self.__inhibit = True
+        try:
+            if self.__catState == OFFLINE:
+                self.__setInd(self.catInd, self.__palRed)
+                self.catcb.setChecked(False)
+                if self.__cat != None:
+                    # Pause CAT, the instance is kept for the next enable
+                    # and only terminated on application close
+                    self.__cat.pause()
+            elif self.__catState == ONLINE:
+                self.__setInd(self.catInd, self.__palGreen)
+                self.catcb.setChecked(True)
+            # Check tracking
+            if self.__rigTrackState == OFFLINE:
+                self.__setInd(self.rigInd, self.__palRed)
+                # If just gone offline wait for it to die
+                if self.__rigif != None:
+                    if self.__rigif.is_alive():
+                        # Not dead yet - re-checked on the next idle tick
+                        # rather than blocking the GUI thread in a sleep loop
+                        return
+                    self.__rigif = None
+                self.rigtrackcb.setChecked(False)
+            elif self.__rigTrackState == FAILED:
+                self.__setInd(self.rigInd, self.__palRed)
+                # If just failed wait for it to die
+                if self.__rigif != None:
+                    if self.__rigif.is_alive():
+                        # Re-checked on the next idle tick
+                        return
+                    self.__msgq.put('Rig tracking terminated')
+                    self.__rigif = None
+                self.rigtrackcb.setChecked(False)
+            elif self.__rigTrackState == WAITING:
+                self.__setInd(self.rigInd, self.__palAmber)
+            elif self.__rigTrackState == ONLINE:
+                self.__setInd(self.rigInd, self.__palGreen)
+                if len(self.__rigTrackFreq) > 0:
+                    self.__updateFreq(self.__rigTrackFreq)
+        finally:
+            self.__inhibit = False
+    
+    # Update the displayed freq
+    def __updateFreq(self, freq):
+        mode, freq = freq
+        # Between tuning events the tracked frequency repeats, so skip
+        # the field update when it hasn't changed
+        if mode == RX:
+            if freq == self.__lastRx:
+                return
+            self.__lastRx = freq
+        else:
+            if freq == self.__lastTx:
+                return
+            self.__lastTx = freq
+        # Frequency is string in Hz
+        # Make it a 9 digit string
+        fs = freq.zfill(9)
+        if mode == RX:
+            # Update RX freq
+            self.__rigrx.setText(fs)
+        else:
+            # Update TX freq
+            self.__rigtx.setText(fs)
+    
+    # Set TX indicator according to actual rig TX state       
+    def __updateTXInd(self):
+        if self.__rigif != None:
+            if self.__rigif.getRigPtt():
+                self.__setInd(self.txInd, self.__palRed)
+            else:
+                self.__setInd(self.txInd, self.__palGreen)
             
\ No newline at end of file